@@ -24,14 +24,14 @@ if __name__ == "__main__":
         channel_type="linear",  # Using linear channel (USDT perpetuals)
         testnet=True,          # Using testnet for demonstration
         ping_interval=20,      # Send ping every 20 seconds
-        reconnect_delay=5      # Wait 5 seconds before reconnecting on disconnection
+        reconnect_delay=5      # Wait at most 5 seconds between reconnection attempts
     )
     
     # Connect to WebSocket server
     client.connect()
     
     # Wait for connection to establish
-    time.sleep(2)
+    client.wait_until_connected()
     
     # Subscribe to orderbook for BTC/USDT
     client.subscribe_orderbook("BTCUSDT", depth=50, callback=handle_orderbook)
@@ -1,8 +1,22 @@
 import websocket
 import json
+import socket
 import threading
 import time
 
+# Prefer orjson for the message hot path, falling back to the stdlib json module
+try:
+    import orjson
+    
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# Socket options for the WebSocket connections: disable Nagle batching so small frames
+# such as pongs are sent immediately
+_SOCKET_OPTIONS = ((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),)
+
 class BinanceWebSocketClient:
     def __init__(self, spot_symbols=None, futures_symbols=None, mark_price_freq='3s', use_all_market_stream=False, testnet=False):
         """
@@ -29,6 +43,9 @@ class BinanceWebSocketClient:
         self.spot_data = {}
         self.mark_price_data = {}
         
+        # Number of spot updates received, so readers can tell whether spot_data changed
+        self.spot_updates = 0
+        
         # Thread references
         self.spot_thread = None
         self.futures_thread = None
@@ -64,7 +81,7 @@ class BinanceWebSocketClient:
         )
         
         # Start WebSocket connection in a thread
-        self.spot_thread = threading.Thread(target=self.spot_ws.run_forever)
+        self.spot_thread = threading.Thread(target=self.spot_ws.run_forever, kwargs={'sockopt': _SOCKET_OPTIONS})
         self.spot_thread.daemon = True
         self.spot_thread.start()
         
@@ -96,7 +113,7 @@ class BinanceWebSocketClient:
         )
         
         # Start WebSocket connection in a thread
-        self.futures_thread = threading.Thread(target=self.futures_ws.run_forever)
+        self.futures_thread = threading.Thread(target=self.futures_ws.run_forever, kwargs={'sockopt': _SOCKET_OPTIONS})
         self.futures_thread.daemon = True
         self.futures_thread.start()
     
@@ -106,7 +123,7 @@ class BinanceWebSocketClient:
     
     def _on_spot_message(self, ws, message):
         try:
-            msg = json.loads(message)
+            msg = _loads(message)
             
             if 'data' in msg:
                 data = msg['data']
@@ -119,6 +136,7 @@ class BinanceWebSocketClient:
                     'ask_qty': float(data['A']),
                     'timestamp': time.time()
                 }
+                self.spot_updates += 1
         except Exception as e:
             print(f"Error processing spot message: {e}")
     
@@ -135,7 +153,7 @@ class BinanceWebSocketClient:
     def _on_futures_message(self, ws, message):
         try:
             # Parse the message
-            data = json.loads(message)
+            data = _loads(message)
             
             # Process based on data structure
             if isinstance(data, list):
@@ -1,20 +1,170 @@
 import json
+import sys
 import time
 import websocket
 import threading
 import logging
+import socket
+import itertools
+import random
+from bisect import bisect_left
+from collections import deque
 from typing import Dict, List, Callable, Optional, Union, Any
 
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# Prefer orjson for the message hot path, falling back to the stdlib json module
+try:
+    import orjson
+    
+    _loads = orjson.loads
+    
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _dumps = json.dumps
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("BybitWebSocketClient")
 
+# Ping frame is constant (Bybit does not require a req_id), so encode it once
+_PING_FRAME = _dumps({"op": "ping"})
+
+# Socket options for the WebSocket connection: send small control frames immediately
+# (no Nagle batching) and use larger buffers for bursty orderbook traffic
+_SOCKET_OPTIONS = (
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20),
+    (socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20),
+)
+
+# Shared read-only fallback for missing ticker entries (never mutated)
+_EMPTY = {}
+
+# Ticker fields with dedicated handling in _process_ticker_data
+_SPECIAL_TICKER_FIELDS = frozenset(('fundingRate', 'nextFundingTime', 'markPrice'))
+
+# Ticker fields converted to float
+_NUMERIC_TICKER_FIELDS = frozenset((
+    'lastPrice', 'indexPrice', 'highPrice24h', 'lowPrice24h',
+    'prevPrice24h', 'price24hPcnt', 'openInterest', 'openInterestValue',
+    'turnover24h', 'volume24h', 'bid1Price', 'bid1Size',
+    'ask1Price', 'ask1Size'
+))
+
+# Precomputed storage key for every known ticker field (avoids a str.lower() per field per message)
+_FIELD_MAP = {
+    src: src.lower()
+    for src in _NUMERIC_TICKER_FIELDS | _SPECIAL_TICKER_FIELDS | {
+        'symbol', 'tickDirection', 'predictedDeliveryPrice', 'basisRate',
+        'basis', 'deliveryFeeRate', 'deliveryTime', 'preOpenPrice', 'preQty'
+    }
+}
+
+class OrderBook:
+    """
+    L2 orderbook for a Bybit symbol, maintained from orderbook snapshot and delta messages.
+    Each side is kept as parallel sorted price/size lists (bid prices negated so both sides
+    ascend) and updated by binary search, so a delta touches only the levels it changes.
+    Pass apply as the orderbook callback: client.subscribe_orderbook(symbol, callback=book.apply)
+    """
+    
+    __slots__ = ('symbol', '_bid_px', '_bid_sz', '_ask_px', '_ask_sz', 'update_id', 'timestamp')
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._bid_px: List[float] = []
+        self._bid_sz: List[float] = []
+        self._ask_px: List[float] = []
+        self._ask_sz: List[float] = []
+        self.update_id = 0
+        self.timestamp = 0
+    
+    def apply(self, message: Dict):
+        """
+        Apply an orderbook snapshot or delta message.
+        
+        Args:
+            message: Orderbook message from the WebSocket ("snapshot" or "delta")
+        """
+        data = message["data"]
+        if message.get("type") == "snapshot":
+            bids = data.get("b", ())
+            asks = data.get("a", ())
+            # Snapshot levels arrive sorted best-first
+            self._bid_px = [-float(level[0]) for level in bids]
+            self._bid_sz = [float(level[1]) for level in bids]
+            self._ask_px = [float(level[0]) for level in asks]
+            self._ask_sz = [float(level[1]) for level in asks]
+        else:
+            bid_px, bid_sz = self._bid_px, self._bid_sz
+            for price, size in data.get("b", ()):
+                self._update_level(bid_px, bid_sz, -float(price), float(size))
+            ask_px, ask_sz = self._ask_px, self._ask_sz
+            for price, size in data.get("a", ()):
+                self._update_level(ask_px, ask_sz, float(price), float(size))
+        
+        self.update_id = data.get("u", self.update_id)
+        self.timestamp = message.get("ts", self.timestamp)
+    
+    @staticmethod
+    def _update_level(prices: List[float], sizes: List[float], key: float, size: float):
+        """
+        Insert, update or (for size 0) delete a price level on one side of the book.
+        """
+        i = bisect_left(prices, key)
+        if i < len(prices) and prices[i] == key:
+            if size:
+                sizes[i] = size
+            else:
+                del prices[i]
+                del sizes[i]
+        elif size:
+            prices.insert(i, key)
+            sizes.insert(i, size)
+    
+    def best_bid(self) -> Optional[tuple]:
+        """Best bid as (price, size), or None if the side is empty."""
+        return (-self._bid_px[0], self._bid_sz[0]) if self._bid_px else None
+    
+    def best_ask(self) -> Optional[tuple]:
+        """Best ask as (price, size), or None if the side is empty."""
+        return (self._ask_px[0], self._ask_sz[0]) if self._ask_px else None
+    
+    def bids(self, depth: Optional[int] = None) -> List[tuple]:
+        """Bid levels as (price, size), best first."""
+        return [(-price, size) for price, size in zip(self._bid_px[:depth], self._bid_sz[:depth])]
+    
+    def asks(self, depth: Optional[int] = None) -> List[tuple]:
+        """Ask levels as (price, size), best first."""
+        return list(zip(self._ask_px[:depth], self._ask_sz[:depth]))
+
+
 class BybitWebSocketClient:
     """
     WebSocket client for Bybit exchange.
     Handles connection, subscription, and message processing for Bybit WebSocket API.
     """
     
+    # Fixed attribute layout: smaller instances and faster attribute access on the hot path
+    __slots__ = (
+        'channel_type', 'testnet', 'ping_interval', 'ping_timeout', 'reconnect_delay',
+        'data', 'ticker_data', 'track_ticker_state', '_ticker_topics_active',
+        'ws_url', 'ws', 'connected', 'subscriptions', 'callbacks', 'default_callback',
+        'ping_thread', '_stop_evt', 'conn_id', 'ws_thread',
+        'dispatch_workers', 'max_queue_size', '_raw_q', '_raw_evt', '_workers', '_workers_running',
+        '_dropped_messages', '_last_drop_log',
+        'lazy_orderbook', '_connected_event', '_topic_cb_cache',
+        '_req_counter', '_reconnect_attempt', '_closed',
+        '_pending_subs', '_pending_lock', '_flush_timer'
+    )
+    
     # WebSocket endpoints
     MAINNET_URLS = {
         "spot": "wss://stream.bybit.com/v5/public/spot",
@@ -30,12 +180,38 @@ class BybitWebSocketClient:
         "option": "wss://stream-testnet.bybit.com/v5/public/option"
     }
     
+    # Initial reconnect backoff delay in seconds
+    RECONNECT_BASE_DELAY = 0.25
+    
+    # Subscriptions requested within this many seconds are sent together,
+    # at most SUBSCRIBE_CHUNK_SIZE topics per frame
+    SUBSCRIBE_DEBOUNCE = 0.01
+    SUBSCRIBE_CHUNK_SIZE = 50
+    
+    # Minimum seconds between warnings about messages dropped from a full queue
+    DROP_LOG_INTERVAL = 5.0
+    
+    # Seconds connect() waits for threads stopped by close() to exit
+    THREAD_JOIN_TIMEOUT = 5.0
+    
+    # Valid orderbook depths per channel type
+    _VALID_DEPTHS = {
+        "spot": (1, 50, 200),
+        "linear": (1, 50, 200, 500),
+        "inverse": (1, 50, 200, 500),
+        "option": (25, 100)
+    }
+    
     def __init__(self, 
                  channel_type: str = "linear", 
                  testnet: bool = False, 
                  ping_interval: int = 20,
                  ping_timeout: int = 10, 
-                 reconnect_delay: int = 5):
+                 reconnect_delay: float = 60,
+                 track_ticker_state: bool = True,
+                 dispatch_workers: int = 1,
+                 max_queue_size: int = 10000,
+                 lazy_orderbook: bool = False):
         """
         Initialize the WebSocket client.
         
@@ -44,7 +220,15 @@ class BybitWebSocketClient:
             testnet: Whether to use testnet or mainnet
             ping_interval: Interval in seconds for sending ping messages
             ping_timeout: Timeout in seconds for ping response
-            reconnect_delay: Delay in seconds before reconnection attempts
+            reconnect_delay: Maximum delay in seconds between reconnection attempts
+                (backoff starts at RECONNECT_BASE_DELAY and doubles per failed attempt)
+            track_ticker_state: Whether to maintain ticker_data from ticker messages.
+                Disable for latency-sensitive clients that only consume callbacks.
+            dispatch_workers: Number of threads parsing and dispatching received messages.
+                Keep at 1 to preserve per-topic message ordering.
+            max_queue_size: Maximum number of raw messages buffered before the oldest are dropped
+            lazy_orderbook: Pass orderbook messages to callbacks as lazy pysimdjson documents
+                instead of dicts. Requires pysimdjson; the document is only valid during the callback.
         """
         self.channel_type = channel_type.lower()
         self.testnet = testnet
@@ -57,6 +241,10 @@ class BybitWebSocketClient:
         
         # Initialize data storage for tickers (including funding rate information)
         self.ticker_data = {}
+        self.track_ticker_state = track_ticker_state
+        
+        # Number of active "tickers.*" subscriptions; ticker state is skipped when zero
+        self._ticker_topics_active = 0
         
         # Validate channel type
         if self.channel_type not in self.MAINNET_URLS:
@@ -70,104 +258,268 @@ class BybitWebSocketClient:
         self.ws = None
         self.connected = False
         self.subscriptions = set()
+        # Topic (or topic type) -> list of callbacks sharing each parsed message
         self.callbacks = {}
         self.default_callback = None
         
+        # Resolved callback per full topic; cleared whenever callbacks change
+        self._topic_cb_cache = {}
+        
+        # Monotonic source of unique req_ids for control frames
+        self._req_counter = itertools.count()
+        
+        # Subscriptions waiting for the debounce timer to send them
+        self._pending_subs = []
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        
         # Threading for ping/pong and reconnection
         self.ping_thread = None
-        self.thread_running = False
+        self._stop_evt = threading.Event()
         
         # Connection ID from server
         self.conn_id = None
+        self.ws_thread = None
+        
+        # Reconnect backoff state; _closed is set by close() to stop reconnecting
+        self._reconnect_attempt = 0
+        self._closed = threading.Event()
+        
+        # Set while the connection is open, so callers can block until it is ready
+        self._connected_event = threading.Event()
+        
+        # Raw message queue drained by the dispatch workers, keeping the receive thread free
+        self.dispatch_workers = max(1, dispatch_workers)
+        self.max_queue_size = max_queue_size
+        # Bounded: when full, appending drops the oldest message atomically
+        self._raw_q = deque(maxlen=max_queue_size)
+        self._raw_evt = threading.Event()
+        self._workers = []
+        self._workers_running = False
+        
+        # Messages dropped from the full queue, reported at most every DROP_LOG_INTERVAL
+        self._dropped_messages = 0
+        self._last_drop_log = 0.0
+        
+        if lazy_orderbook and simdjson is None:
+            logger.warning("pysimdjson is not installed, orderbook messages will be parsed eagerly")
+        self.lazy_orderbook = lazy_orderbook and simdjson is not None
     
     def connect(self):
         """
         Establish WebSocket connection.
+        A single connection thread keeps the connection alive, reconnecting with backoff until close().
         """
-        try:
-            self.ws = websocket.WebSocketApp(
-                self.ws_url,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                on_open=self._on_open
-            )
-            
-            # Start WebSocket connection in a separate thread
-            self.ws_thread = threading.Thread(target=self.ws.run_forever)
-            self.ws_thread.daemon = True
-            self.ws_thread.start()
+        if self._closed.is_set():
+            # close() stopped the previous threads; let them exit first, so stale workers
+            # never run alongside new ones (breaking per-topic ordering). Threads still alive
+            # after the timeout (e.g. stuck in a callback) resume once the flags are reset
+            current = threading.current_thread()
+            for thread in (self.ws_thread, *self._workers):
+                if thread is not None and thread is not current and thread.is_alive():
+                    thread.join(self.THREAD_JOIN_TIMEOUT)
+            self._closed.clear()
+        
+        self._start_workers()
+        
+        # The connection thread already handles (re)connecting
+        if self.ws_thread is not None and self.ws_thread.is_alive():
+            return
+        
+        self.ws_thread = threading.Thread(target=self._run_forever_loop)
+        self.ws_thread.daemon = True
+        self.ws_thread.start()
+    
+    def _run_forever_loop(self):
+        """
+        Run the WebSocket connection, reconnecting iteratively after each disconnect until closed.
+        """
+        while not self._closed.is_set():
+            try:
+                self.ws = websocket.WebSocketApp(
+                    self.ws_url,
+                    on_message=self._on_message,
+                    on_error=self._on_error,
+                    on_close=self._on_close,
+                    on_open=self._on_open
+                )
+                logger.info(f"Connecting to {self.ws_url}")
+                
+                # Skip websocket-client's pure-Python UTF-8 validation of every text frame;
+                # payloads are validated by the JSON parser anyway
+                self.ws.run_forever(sockopt=_SOCKET_OPTIONS, skip_utf8_validation=True)
+            except Exception as e:
+                logger.error(f"Error connecting to WebSocket: {e}")
             
-            logger.info(f"Connecting to {self.ws_url}")
-        except Exception as e:
-            logger.error(f"Error connecting to WebSocket: {e}")
-            self._reconnect()
+            if not self._closed.is_set():
+                self._backoff()
     
     def _on_open(self, ws):
         """
         Called when WebSocket connection is established.
         """
         self.connected = True
+        self._reconnect_attempt = 0
         logger.info(f"WebSocket connection established to {self.ws_url}")
         
-        # Start the ping thread
-        self.thread_running = True
-        self.ping_thread = threading.Thread(target=self._ping_loop)
+        # Start the ping thread with its own stop event, so a ping thread from a
+        # previous connection can never be revived by this one
+        self._stop_evt = threading.Event()
+        self.ping_thread = threading.Thread(target=self._ping_loop, args=(self._stop_evt,))
         self.ping_thread.daemon = True
         self.ping_thread.start()
         
         # Resubscribe to all topics if there were any
         self._resubscribe()
+        
+        self._connected_event.set()
+    
+    def _start_workers(self):
+        """
+        Start the message dispatch worker threads if they are not already running.
+        """
+        if self._workers_running:
+            return
+        
+        self._workers_running = True
+        # Workers that outlived a close() carry on, so only the missing ones are started
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        for i in range(len(self._workers), self.dispatch_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"BybitDispatch-{i}")
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+    
+    def _worker_loop(self):
+        """
+        Drain the raw message queue, parsing and dispatching each message.
+        """
+        raw_q = self._raw_q
+        raw_evt = self._raw_evt
+        # simdjson parsers reuse their buffers and are not thread-safe, so each worker owns one
+        parser = simdjson.Parser() if self.lazy_orderbook else None
+        dispatch = self._make_dispatcher(parser)
+        while self._workers_running:
+            try:
+                message = raw_q.popleft()
+            except IndexError:
+                raw_evt.clear()
+                # A message may have arrived between popleft and clear
+                if not raw_q:
+                    raw_evt.wait(1)
+                continue
+            try:
+                dispatch(message)
+            except Exception:
+                # A failing callback must not take down the worker
+                logger.exception("Error processing message")
     
     def _on_message(self, ws, message):
         """
         Called when a message is received from the WebSocket server.
+        Only enqueues the raw message; parsing and callbacks run on the dispatch workers.
         """
-        try:
-            data = json.loads(message)
-            
-            # Handle pong response
-            if "op" in data and data.get("op") == "ping":
-                logger.debug("Received pong response")
-                if "conn_id" in data:
-                    self.conn_id = data["conn_id"]
+        raw_q = self._raw_q
+        if len(raw_q) == raw_q.maxlen:
+            # The append below drops the oldest message; only count it here, since
+            # warning for every frame would flood the log while the workers catch up
+            self._dropped_messages += 1
+            now = time.monotonic()
+            if now - self._last_drop_log >= self.DROP_LOG_INTERVAL:
+                self._last_drop_log = now
+                logger.warning(f"Message queue full ({raw_q.maxlen}), {self._dropped_messages} messages dropped so far")
+        raw_q.append(message)
+        self._raw_evt.set()
+    
+    def _make_dispatcher(self, parser=None) -> Callable:
+        """
+        Build the per-worker dispatch function, which parses a raw message and routes it
+        to ticker processing and callbacks. Only decoding errors are handled; callback
+        exceptions propagate to the caller.
+        
+        Everything the hot path needs is bound once as a closure variable, so each message
+        costs cheap cell loads instead of repeated attribute lookups on self. The bound
+        objects must therefore never be rebound: _topic_cb_cache is only ever cleared in place.
+        
+        Args:
+            parser: Optional simdjson parser; orderbook messages are then left as lazy documents
+        
+        Returns:
+            Callable: Function taking one raw message
+        """
+        cache_get = self._topic_cb_cache.get
+        resolve_callbacks = self._resolve_callbacks
+        process_ticker_data = self._process_ticker_data
+        handle_control = self._handle_control
+        loads = _loads
+        
+        def dispatch(message):
+            try:
+                if parser is not None:
+                    data = parser.parse(message)
+                    # Only orderbook frames stay lazy; everything else is small and fully consumed
+                    if not data.get("topic", "").startswith("orderbook."):
+                        data = data.as_dict()
+                else:
+                    data = loads(message)
+            except ValueError:
+                # Covers json, orjson and simdjson decode errors
+                logger.error(f"Failed to decode message: {message}")
                 return
             
-            # Check if it's a subscription confirmation
-            if "op" in data and data.get("op") == "subscribe":
-                logger.info(f"Subscription success: {data}")
+            # Regular data message (the hot path)
+            topic = data.get("topic")
+            if topic is None:
+                handle_control(data)
                 return
             
-            # Regular data message
-            if "topic" in data:
-                topic = data["topic"]
-                topic_base = topic.split(".")[0]
-                
-                # Process ticker data
-                if topic_base == "tickers":
-                    self._process_ticker_data(data)
-                
-                # Check for specific topic callback
-                if topic in self.callbacks:
-                    self.callbacks[topic](data)
-                # Check for topic type callback (e.g., 'orderbook')
-                elif topic_base in self.callbacks:
-                    self.callbacks[topic_base](data)
-                # Use default callback if available
-                elif self.default_callback:
-                    self.default_callback(data)
-                # else:
-                #     logger.info(f"Received message for topic {topic}, but no callback registered")
-            else:
-                # Handle other message types
-                logger.debug(f"Received message: {data}")
-                if self.default_callback:
-                    self.default_callback(data)
-                
-        except json.JSONDecodeError:
-            logger.error(f"Failed to decode message: {message}")
-        except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            # Process ticker data (only when ticker state is being tracked)
+            if self.track_ticker_state and self._ticker_topics_active and topic.startswith("tickers."):
+                process_ticker_data(data)
+            
+            # The parsed message is shared by all callbacks and must not be mutated
+            callbacks = cache_get(topic)
+            if callbacks is None:
+                callbacks = resolve_callbacks(topic)
+            for callback in callbacks:
+                callback(data)
+        
+        return dispatch
+    
+    def _handle_control(self, data: Dict[str, Any]):
+        """
+        Handle a message without a topic (pong, subscription confirmation, etc.).
+        """
+        op = data.get("op")
+        
+        # Handle pong response
+        if op == "ping":
+            logger.debug("Received pong response")
+            if "conn_id" in data:
+                self.conn_id = data["conn_id"]
+        # Check if it's a subscription confirmation
+        elif op == "subscribe":
+            logger.info(f"Subscription success: {data}")
+        else:
+            # Handle other message types
+            logger.debug(f"Received message: {data}")
+            if self.default_callback:
+                self.default_callback(data)
+    
+    def _resolve_callbacks(self, topic: str) -> tuple:
+        """
+        Resolve and cache the callbacks for a topic: all callbacks registered for the
+        specific topic and its topic type (e.g., 'orderbook'), else the default callback.
+        """
+        # Interned so the cache key is shared with the subscribed topic string
+        topic = sys.intern(topic)
+        callbacks = self.callbacks
+        topic_base = topic.partition(".")[0]
+        resolved = tuple(callbacks.get(topic, ())) + tuple(callbacks.get(topic_base, ()))
+        if not resolved and self.default_callback:
+            resolved = (self.default_callback,)
+        self._topic_cb_cache[topic] = resolved
+        return resolved
     
     def _on_error(self, ws, error):
         """
@@ -180,103 +532,143 @@ class BybitWebSocketClient:
         Called when the WebSocket connection is closed.
         """
         self.connected = False
-        self.thread_running = False
+        self._connected_event.clear()
+        self._stop_evt.set()
         
         # Log closure details
         if close_status_code or close_msg:
             logger.info(f"WebSocket connection closed with code {close_status_code}: {close_msg}")
         else:
             logger.info("WebSocket connection closed")
-        
-        # Try to reconnect
-        self._reconnect()
     
-    def _reconnect(self):
+    def _backoff(self):
         """
-        Attempt to reconnect to the WebSocket server.
+        Wait before the next reconnection attempt.
+        Uses exponential backoff with jitter so many clients do not reconnect in lockstep.
         """
-        if not self.connected:
-            logger.info(f"Attempting to reconnect in {self.reconnect_delay} seconds...")
-            time.sleep(self.reconnect_delay)
-            self.connect()
+        delay = min(self.reconnect_delay, self.RECONNECT_BASE_DELAY * 2 ** self._reconnect_attempt)
+        delay *= random.uniform(0.5, 1.5)
+        self._reconnect_attempt += 1
+        logger.info(f"Attempting to reconnect in {delay:.2f} seconds (attempt {self._reconnect_attempt})...")
+        # Returns early if close() is called meanwhile
+        self._closed.wait(delay)
     
-    def _ping_loop(self):
+    def _ping_loop(self, stop_evt: threading.Event):
         """
         Send ping messages at regular intervals to keep the connection alive.
+        
+        Args:
+            stop_evt: Event that ends the loop when set
         """
         ping_count = 0
-        while self.thread_running:
+        while not stop_evt.is_set():
             try:
                 if self.connected:
-                    ping_message = json.dumps({
-                        "req_id": f"ping_{ping_count}",
-                        "op": "ping"
-                    })
-                    self.ws.send(ping_message)
+                    self.ws.send(_PING_FRAME)
                     logger.debug(f"Ping sent ({ping_count})")
                     ping_count += 1
             except Exception as e:
                 logger.error(f"Error sending ping: {e}")
                 
-            # Sleep for ping interval
-            for _ in range(self.ping_interval):
-                if not self.thread_running:
-                    break
-                time.sleep(1)
+            # Sleep for ping interval, waking immediately on stop
+            stop_evt.wait(self.ping_interval)
     
     def subscribe(self, topics: Union[str, List[str]], callback: Optional[Callable] = None):
         """
         Subscribe to one or more topics.
         
         Args:
-            topics: A single topic string or a list of topic strings
-            callback: Optional callback function for processing messages
+            topics: A single topic string or a list of topic strings. Topics are stored
+                interned, so keep comparing topics with == rather than relying on identity.
+            callback: Optional callback function for processing messages. It is added alongside
+                any callbacks already registered for the topic; all of them share one parsed message.
         """
         if isinstance(topics, str):
             topics = [topics]
         
+        # Intern topics so callback lookups against incoming topics hit the identity fast path
+        topics = [sys.intern(topic) for topic in topics]
+        
         # Validate topics before subscribing
         if not topics:
             logger.error("No topics provided for subscription")
             return False
         
-        # Prevent exceeding args length (21,000 chars) as per documentation
-        args_str = json.dumps(topics)
-        if len(args_str) > 21000:
-            logger.error(f"Topics length exceeds 21,000 characters: {len(args_str)}")
+        # Prevent exceeding args length (21,000 chars) as per documentation. The encoded
+        # length is each topic plus its quotes and separator, plus the brackets; topics are
+        # only serialized to measure them when close to the limit (escaping could add more)
+        args_len = sum(len(topic) for topic in topics) + 3 * len(topics) + 1
+        if args_len > 20000:
+            args_len = len(_dumps(topics))
+        if args_len > 21000:
+            logger.error(f"Topics length exceeds 21,000 characters: {args_len}")
             return False
         
         # Apply callback if provided
         if callback:
             for topic in topics:
-                # Extract base topic (e.g., 'orderbook' from 'orderbook.50.BTCUSDT')
-                base_topic = topic.split('.')[0]
-                if '.' in topic:
-                    self.callbacks[topic] = callback
-                else:
-                    self.callbacks[base_topic] = callback
+                registered = self.callbacks.setdefault(topic, [])
+                if callback not in registered:
+                    registered.append(callback)
+            self._topic_cb_cache.clear()
         
         if not self.connected:
-            # Store subscriptions for later if not connected
-            self.subscriptions.update(topics)
-            logger.info(f"Will subscribe to {topics} once connected")
+            # Connect (unless a connection is already in progress) and wait until it is ready
             self.connect()
-            return False
+            if not self._connected_event.wait(timeout=5):
+                # Store subscriptions for later if still not connected
+                with self._pending_lock:
+                    self._count_ticker_topics(topics)
+                    self.subscriptions.update(topics)
+                logger.info(f"Will subscribe to {topics} once connected")
+                return False
         
-        try:
-            # Send subscription request
-            request = {
-                "req_id": f"sub_{int(time.time() * 1000)}",
-                "op": "subscribe",
-                "args": topics
-            }
-            self.ws.send(json.dumps(request))
-            self.subscriptions.update(topics)
-            logger.info(f"Subscribed to: {topics}")
-            return True
-        except Exception as e:
-            logger.error(f"Error subscribing to topics {topics}: {e}")
-            return False
+        # Queue the topics; subscribe calls made within the debounce window share frames
+        with self._pending_lock:
+            self._count_ticker_topics(topics)
+            self._pending_subs.extend(topics)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.SUBSCRIBE_DEBOUNCE, self._flush_subscriptions)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return True
+    
+    def _count_ticker_topics(self, topics: List[str]):
+        """
+        Add the ticker topics that are neither subscribed nor queued yet to the active
+        ticker topic count. Must be called with _pending_lock held, before recording them.
+        """
+        new_topics = {topic for topic in topics if topic.startswith("tickers.")}
+        if new_topics:
+            new_topics.difference_update(self.subscriptions, self._pending_subs)
+            self._ticker_topics_active += len(new_topics)
+    
+    def _flush_subscriptions(self):
+        """
+        Send all queued subscriptions, in frames of up to SUBSCRIBE_CHUNK_SIZE topics.
+        """
+        with self._pending_lock:
+            # Preserve order while dropping topics queued more than once
+            topics = list(dict.fromkeys(self._pending_subs))
+            self._pending_subs = []
+            self._flush_timer = None
+        
+        chunk_size = self.SUBSCRIBE_CHUNK_SIZE
+        for i in range(0, len(topics), chunk_size):
+            chunk = topics[i:i+chunk_size]
+            try:
+                # Send subscription request
+                request = {
+                    "req_id": f"sub_{next(self._req_counter)}",
+                    "op": "subscribe",
+                    "args": chunk
+                }
+                self.ws.send(_dumps(request))
+                logger.info(f"Subscribed to: {chunk}")
+            except Exception as e:
+                # Still recorded below, so the topics are resubscribed once reconnected
+                logger.error(f"Error subscribing to topics {chunk}: {e}")
+            self.subscriptions.update(chunk)
     
     def unsubscribe(self, topics: Union[str, List[str]]):
         """
@@ -299,20 +691,29 @@ class BybitWebSocketClient:
         try:
             # Send unsubscription request
             request = {
-                "req_id": f"unsub_{int(time.time() * 1000)}",
+                "req_id": f"unsub_{next(self._req_counter)}",
                 "op": "unsubscribe",
                 "args": topics
             }
-            self.ws.send(json.dumps(request))
+            self.ws.send(_dumps(request))
             
-            # Remove from our subscription list
-            self.subscriptions.difference_update(topics)
+            removed = set(topics)
+            with self._pending_lock:
+                # Keep the active ticker topic count in sync; topics still queued count too
+                pending = set(self._pending_subs)
+                for topic in removed:
+                    if topic.startswith("tickers.") and (topic in self.subscriptions or topic in pending):
+                        self._ticker_topics_active -= 1
+                
+                # Remove from our subscription list and from the queue
+                self.subscriptions.difference_update(removed)
+                if pending & removed:
+                    self._pending_subs = [topic for topic in self._pending_subs if topic not in removed]
             
             # Remove callbacks for these topics
             for topic in topics:
-                base_topic = topic.split('.')[0]
-                if topic in self.callbacks:
-                    del self.callbacks[topic]
+                self.callbacks.pop(topic, None)
+            self._topic_cb_cache.clear()
                 
             logger.info(f"Unsubscribed from: {topics}")
             return True
@@ -327,20 +728,38 @@ class BybitWebSocketClient:
         if not self.subscriptions:
             return
             
-        current_subs = list(self.subscriptions)
+        # Snapshot as a tuple: other threads may add deferred subscriptions meanwhile
+        current_subs = tuple(self.subscriptions)
         logger.info(f"Resubscribing to {len(current_subs)} topics")
         
-        # Break into chunks to avoid exceeding message size limits
-        chunk_size = 50
-        for i in range(0, len(current_subs), chunk_size):
-            chunk = current_subs[i:i+chunk_size]
-            request = {
-                "req_id": f"resub_{int(time.time() * 1000)}",
+        # Break into chunks to avoid exceeding message size limits, and encode
+        # every frame up front so the burst goes out back to back
+        chunk_size = self.SUBSCRIBE_CHUNK_SIZE
+        topic_iter = iter(current_subs)
+        frames = []
+        while chunk := list(itertools.islice(topic_iter, chunk_size)):
+            frames.append(_dumps({
+                "req_id": f"resub_{next(self._req_counter)}",
                 "op": "subscribe",
                 "args": chunk
-            }
-            self.ws.send(json.dumps(request))
-            logger.info(f"Resubscribed to chunk of {len(chunk)} topics")
+            }))
+        
+        send = self.ws.send
+        for frame in frames:
+            send(frame)
+        logger.info(f"Resubscribed to {len(current_subs)} topics in {len(frames)} chunks")
+    
+    def wait_until_connected(self, timeout: float = 10) -> bool:
+        """
+        Block until the WebSocket connection is established.
+        
+        Args:
+            timeout: Maximum time in seconds to wait
+        
+        Returns:
+            bool: True if connected, False if the timeout expired
+        """
+        return self._connected_event.wait(timeout)
     
     def set_default_callback(self, callback: Callable):
         """
@@ -350,29 +769,26 @@ class BybitWebSocketClient:
             callback: The callback function to use
         """
         self.default_callback = callback
+        self._topic_cb_cache.clear()
     
-    def subscribe_orderbook(self, symbol: str, depth: int = 50, callback: Optional[Callable] = None):
+    def subscribe_orderbook(self, symbol: Union[str, List[str]], depth: int = 50, callback: Optional[Callable] = None):
         """
-        Subscribe to orderbook updates for a specific symbol.
+        Subscribe to orderbook updates for one or more symbols.
         
         Args:
-            symbol: The trading pair symbol (e.g., "BTCUSDT")
+            symbol: The trading pair symbol (e.g., "BTCUSDT"), or a list of symbols to
+                subscribe in a single request
             depth: Orderbook depth (1, 50, 200, or 500 for linear/inverse, 1, 50, 200 for spot)
             callback: Callback function to process orderbook messages
         """
-        valid_depths = {
-            "spot": [1, 50, 200],
-            "linear": [1, 50, 200, 500],
-            "inverse": [1, 50, 200, 500],
-            "option": [25, 100]
-        }
-        
-        if depth not in valid_depths.get(self.channel_type, []):
-            logger.error(f"Invalid depth {depth} for {self.channel_type}. Valid depths: {valid_depths.get(self.channel_type)}")
+        allowed = self._VALID_DEPTHS.get(self.channel_type, ())
+        if depth not in allowed:
+            logger.error("Invalid depth %s for %s. Valid depths: %s", depth, self.channel_type, allowed)
             return False
         
-        topic = f"orderbook.{depth}.{symbol}"
-        return self.subscribe(topic, callback)
+        if isinstance(symbol, str):
+            return self.subscribe(f"orderbook.{depth}.{symbol}", callback)
+        return self.subscribe([f"orderbook.{depth}.{s}" for s in symbol], callback)
     
     def subscribe_trades(self, symbol: str, callback: Optional[Callable] = None):
         """
@@ -385,28 +801,41 @@ class BybitWebSocketClient:
         topic = f"publicTrade.{symbol}"
         return self.subscribe(topic, callback)
     
-    def subscribe_ticker(self, symbol: str, callback: Optional[Callable] = None):
+    def subscribe_ticker(self, symbol: Union[str, List[str]], callback: Optional[Callable] = None):
         """
-        Subscribe to ticker updates for a specific symbol.
+        Subscribe to ticker updates for one or more symbols.
         
         Args:
-            symbol: The trading pair symbol (e.g., "BTCUSDT")
+            symbol: The trading pair symbol (e.g., "BTCUSDT"), or a list of symbols to
+                subscribe in a single request
             callback: Callback function to process ticker messages
         
         Returns:
             bool: True if subscription was successful, False otherwise
         """
-        topic = f"tickers.{symbol}"
-        return self.subscribe(topic, callback)
+        symbols = [symbol] if isinstance(symbol, str) else symbol
+        topics = [f"tickers.{s}" for s in symbols]
+        return self.subscribe(topics, callback)
     
     def close(self):
         """
         Close the WebSocket connection.
         """
-        self.thread_running = False
+        self._closed.set()
+        self._stop_evt.set()
+        self._workers_running = False
+        self._raw_evt.set()
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            # Keep unsent topics so a later connect() resubscribes them
+            self.subscriptions.update(self._pending_subs)
+            self._pending_subs = []
         if self.ws:
             self.ws.close()
         self.connected = False
+        self._connected_event.clear()
         logger.info("WebSocket connection closed")
     
     def get_data(self, symbol: Optional[str] = None):
@@ -441,6 +870,22 @@ class BybitWebSocketClient:
         else:
             return self.ticker_data
     
+    def get_ticker_data_copy(self, symbol: Optional[str] = None):
+        """
+        Get a snapshot copy of the latest ticker data.
+        Ticker entries are updated in place, so use this when a consistent view is needed.
+        
+        Args:
+            symbol: Optional symbol to get data for. If None, returns all data.
+        
+        Returns:
+            dict: A copy of the latest ticker data
+        """
+        if symbol:
+            return dict(self.ticker_data.get(symbol, {}))
+        else:
+            return {sym: dict(ticker) for sym, ticker in list(self.ticker_data.items())}
+    
     def get_funding_rate(self, symbol: str) -> float:
         """
         Get the current funding rate for a symbol.
@@ -476,6 +921,9 @@ class BybitWebSocketClient:
         Args:
             message: The ticker message from WebSocket
         """
+        # Bind the store to a local once; it is read several times per message
+        td = self.ticker_data
+        
         try:
             topic = message.get("topic", "")
             message_type = message.get("type", "snapshot")
@@ -496,12 +944,8 @@ class BybitWebSocketClient:
             # Log raw data for debugging
             logger.debug(f"Received {message_type} for {symbol}: {message}")
             
-            # Standard fields we want to extract from any ticker message
-            funding_rate = 0
-            next_funding_time = 0
-            
             # Process based on message type
-            if message_type == "snapshot" or symbol not in self.ticker_data:
+            if message_type == "snapshot" or symbol not in td:
                 # For snapshot or new symbol, create fresh ticker data object with all fields
                 ticker_data = {
                     'symbol': symbol,
@@ -513,12 +957,10 @@ class BybitWebSocketClient:
                 if isinstance(data, dict):
                     # Extract key fields with specific handling
                     if 'fundingRate' in data:
-                        funding_rate = float(data['fundingRate'])
-                        ticker_data['funding_rate'] = funding_rate
+                        ticker_data['funding_rate'] = float(data['fundingRate'])
                     
                     if 'nextFundingTime' in data:
-                        next_funding_time = int(data['nextFundingTime'])
-                        ticker_data['next_funding_time'] = next_funding_time
+                        ticker_data['next_funding_time'] = int(data['nextFundingTime'])
                     
                     if 'markPrice' in data:
                         ticker_data['mark_price'] = float(data['markPrice'])
@@ -526,24 +968,23 @@ class BybitWebSocketClient:
                     # Copy all other fields, converting numeric values to float where appropriate
                     for key, value in data.items():
                         # Skip already processed special fields
-                        if key in ['fundingRate', 'nextFundingTime', 'markPrice']:
+                        if key in _SPECIAL_TICKER_FIELDS:
                             continue
                         
+                        out_key = _FIELD_MAP.get(key) or key.lower()
+                        
                         # Try to convert numeric values to float
-                        if key in ['lastPrice', 'indexPrice', 'highPrice24h', 'lowPrice24h', 
-                                  'prevPrice24h', 'price24hPcnt', 'openInterest', 'openInterestValue',
-                                  'turnover24h', 'volume24h', 'bid1Price', 'bid1Size', 
-                                  'ask1Price', 'ask1Size']:
+                        if key in _NUMERIC_TICKER_FIELDS:
                             try:
-                                ticker_data[key.lower()] = float(value)
+                                ticker_data[out_key] = float(value)
                             except (TypeError, ValueError):
-                                ticker_data[key.lower()] = value
+                                ticker_data[out_key] = value
                         else:
-                            ticker_data[key.lower()] = value
+                            ticker_data[out_key] = value
             
             elif message_type == "delta":
-                # For delta messages, update only the changed fields
-                ticker_data = self.ticker_data.get(symbol, {}).copy()
+                # For delta messages, update only the changed fields in place
+                ticker_data = td.setdefault(symbol, {})
                 ticker_data['timestamp'] = message.get("ts", int(time.time() * 1000))
                 ticker_data['checksum'] = message.get("cs", ticker_data.get('checksum', 0))
                 
@@ -551,12 +992,10 @@ class BybitWebSocketClient:
                 if isinstance(data, dict):
                     # Handle key fields specifically
                     if 'fundingRate' in data:
-                        funding_rate = float(data['fundingRate'])
-                        ticker_data['funding_rate'] = funding_rate
+                        ticker_data['funding_rate'] = float(data['fundingRate'])
                     
                     if 'nextFundingTime' in data:
-                        next_funding_time = int(data['nextFundingTime'])
-                        ticker_data['next_funding_time'] = next_funding_time
+                        ticker_data['next_funding_time'] = int(data['nextFundingTime'])
                     
                     if 'markPrice' in data:
                         ticker_data['mark_price'] = float(data['markPrice'])
@@ -564,20 +1003,19 @@ class BybitWebSocketClient:
                     # Update other fields, converting numeric values where appropriate
                     for key, value in data.items():
                         # Skip already processed special fields
-                        if key in ['fundingRate', 'nextFundingTime', 'markPrice']:
+                        if key in _SPECIAL_TICKER_FIELDS:
                             continue
+                        
+                        out_key = _FIELD_MAP.get(key) or key.lower()
                             
                         # Try to convert numeric values to float
-                        if key in ['lastPrice', 'indexPrice', 'highPrice24h', 'lowPrice24h', 
-                                  'prevPrice24h', 'price24hPcnt', 'openInterest', 'openInterestValue',
-                                  'turnover24h', 'volume24h', 'bid1Price', 'bid1Size', 
-                                  'ask1Price', 'ask1Size']:
+                        if key in _NUMERIC_TICKER_FIELDS:
                             try:
-                                ticker_data[key.lower()] = float(value)
+                                ticker_data[out_key] = float(value)
                             except (TypeError, ValueError):
-                                ticker_data[key.lower()] = value
+                                ticker_data[out_key] = value
                         else:
-                            ticker_data[key.lower()] = value
+                            ticker_data[out_key] = value
             
             else:
                 logger.warning(f"Unknown message type '{message_type}' for {symbol}")
@@ -585,18 +1023,19 @@ class BybitWebSocketClient:
             
             # Ensure we have the funding rate and mark price in a consistent format
             # If we didn't extract funding rate from this message, use the existing value
-            if 'funding_rate' not in ticker_data and funding_rate == 0:
-                ticker_data['funding_rate'] = self.ticker_data.get(symbol, {}).get('funding_rate', 0)
+            prev = td.get(symbol) or _EMPTY
+            if 'funding_rate' not in ticker_data:
+                ticker_data['funding_rate'] = prev.get('funding_rate', 0)
                 
-            if 'next_funding_time' not in ticker_data and next_funding_time == 0:
-                ticker_data['next_funding_time'] = self.ticker_data.get(symbol, {}).get('next_funding_time', 0)
+            if 'next_funding_time' not in ticker_data:
+                ticker_data['next_funding_time'] = prev.get('next_funding_time', 0)
             
             # Ensure we have mark price in a standard field name
             if 'mark_price' not in ticker_data and 'markprice' in ticker_data:
                 ticker_data['mark_price'] = ticker_data['markprice']
             
-            # Store the updated ticker data
-            self.ticker_data[symbol] = ticker_data
+            # Store the updated ticker data (deltas already mutated the stored dict)
+            td[symbol] = ticker_data
             
             # Log successful update but only for important changes to avoid spam
             if message_type == "snapshot" or 'funding_rate' in data or 'nextFundingTime' in data:
@@ -615,7 +1054,7 @@ if __name__ == "__main__":
     
     client = BybitWebSocketClient(testnet=True, channel_type="linear")
     client.connect()
-    time.sleep(2)  # Give time to establish connection
+    client.wait_until_connected()
     
     # Subscribe to BTC orderbook
     client.subscribe_orderbook("BTCUSDT", depth=50, callback=handle_orderbook)
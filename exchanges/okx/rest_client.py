@@ -1,8 +1,25 @@
 import requests
 import logging
 import time
-from typing import Dict, List, Optional, Union, Any
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Union, Any
 from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Parse response bodies straight from bytes; orjson when available, else the stdlib
+# json module (which also accepts bytes)
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -18,7 +35,21 @@ class OkxRestClient:
     BASE_URL = "https://www.okx.com"
     TESTNET_BASE_URL = "https://www.okx.com"  # Using same URL but will add demo flag in headers
     
-    def __init__(self, testnet: bool = False, api_key: str = None, api_secret: str = None, passphrase: str = None):
+    # Maximum number of requests in flight for batched endpoints
+    MAX_CONCURRENT_REQUESTS = 10
+    
+    # Per-endpoint rate limit (most OKX public endpoints allow 20 requests per 2 seconds)
+    RATE_LIMIT_REQUESTS = 20
+    RATE_LIMIT_WINDOW = 2.0
+    
+    # HTTP session shared by all client instances (reference counted), so TLS handshakes
+    # and pooled connections are reused across clients
+    _shared_session: Optional[requests.Session] = None
+    _session_refs = 0
+    _session_lock = threading.Lock()
+    
+    def __init__(self, testnet: bool = False, api_key: str = None, api_secret: str = None, passphrase: str = None,
+                 cache_ttl: float = 300):
         """
         Initialize the OKX REST client.
         
@@ -27,6 +58,7 @@ class OkxRestClient:
             api_key: API key for authenticated endpoints (optional)
             api_secret: API secret for authenticated endpoints (optional)
             passphrase: API passphrase for authenticated endpoints (optional)
+            cache_ttl: Seconds to cache instrument lists and the instrument ID mapping (0 disables)
         """
         self.testnet = testnet
         self.api_key = api_key
@@ -36,15 +68,52 @@ class OkxRestClient:
         # Base URL selection
         self.base_url = self.TESTNET_BASE_URL if testnet else self.BASE_URL
         
-        # HTTP Session for connection pooling
-        self.session = requests.Session()
+        # Shared HTTP session for connection pooling
+        self.session = self._acquire_session()
+        self._session_released = False
+        
+        # Rate limiting state: recent request start times per endpoint
+        self._request_times = {}
+        self._rate_limit_lock = threading.Lock()
         
-        # Rate limiting parameters
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms minimum between requests
+        # TTL caches for instrument data, which changes over minutes to hours rather than per call
+        self.cache_ttl = cache_ttl
+        self._instruments_cache = {}  # (inst_type, uly, inst_family, inst_id) -> (expiry, instruments)
+        self._mapping_cache = None    # (expiry, mapping)
         
         logger.info(f"Initialized OKX REST client {'for demo trading' if testnet else 'for production'}")
     
+    @classmethod
+    def _acquire_session(cls) -> requests.Session:
+        """
+        Get the shared HTTP session, creating it on first use.
+        
+        Returns:
+            The shared requests.Session
+        """
+        with cls._session_lock:
+            if cls._shared_session is None:
+                session = requests.Session()
+                retries = Retry(total=3, backoff_factor=0.2, status_forcelist=(429, 500, 502, 503, 504),
+                                allowed_methods=("GET",))
+                adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries)
+                session.mount("https://", adapter)
+                cls._shared_session = session
+            cls._session_refs += 1
+            return cls._shared_session
+    
+    @classmethod
+    def _release_session(cls):
+        """
+        Release a reference to the shared HTTP session, closing it when no client uses it.
+        """
+        with cls._session_lock:
+            cls._session_refs -= 1
+            if cls._session_refs <= 0 and cls._shared_session is not None:
+                cls._shared_session.close()
+                cls._shared_session = None
+                cls._session_refs = 0
+    
     def _get_headers(self, endpoint: str = None, method: str = None, body: str = None) -> Dict:
         """
         Generate headers for API request.
@@ -74,16 +143,32 @@ class OkxRestClient:
         
         return headers
     
-    def _rate_limit(self):
-        """Apply rate limiting to avoid API rate limits"""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        
-        if elapsed < self.min_request_interval:
-            sleep_time = self.min_request_interval - elapsed
-            time.sleep(sleep_time)
+    def _rate_limit(self, endpoint: str):
+        """
+        Apply per-endpoint rate limiting to avoid API rate limits.
+        Requests within the budget proceed immediately (bursts are allowed); only a caller
+        that would exceed RATE_LIMIT_REQUESTS per RATE_LIMIT_WINDOW for its endpoint waits.
+        
+        Args:
+            endpoint: API endpoint the request is for
+        """
+        while True:
+            with self._rate_limit_lock:
+                now = time.monotonic()
+                window = self._request_times.setdefault(endpoint, deque())
+                
+                # Drop request times that fell out of the window
+                while window and now - window[0] >= self.RATE_LIMIT_WINDOW:
+                    window.popleft()
+                
+                if len(window) < self.RATE_LIMIT_REQUESTS:
+                    window.append(now)
+                    return
+                
+                wait_time = self.RATE_LIMIT_WINDOW - (now - window[0])
             
-        self.last_request_time = time.time()
+            # Sleep outside the lock so requests to other endpoints are not held up
+            time.sleep(wait_time)
     
     def _request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
         """
@@ -99,7 +184,7 @@ class OkxRestClient:
             Response data as dictionary
         """
         # Apply rate limiting
-        self._rate_limit()
+        self._rate_limit(endpoint)
         
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers(endpoint, method, data)
@@ -117,8 +202,8 @@ class OkxRestClient:
             # Check for HTTP errors
             response.raise_for_status()
             
-            # Parse JSON response
-            response_data = response.json()
+            # Parse JSON response from the raw bytes (skips decoding to str first)
+            response_data = _loads(response.content)
             
             # Check for API errors
             if response_data.get("code") != "0":
@@ -132,6 +217,7 @@ class OkxRestClient:
             logger.error(f"URL: {url}, Parameters: {params}")
             return {"code": "-1", "msg": f"Request failed: {str(e)}", "data": []}
         except ValueError as e:
+            # Covers json and orjson decode errors
             logger.error(f"Error parsing response: {e}")
             return {"code": "-1", "msg": f"Parse error: {str(e)}", "data": []}
     
@@ -158,6 +244,12 @@ class OkxRestClient:
             logger.error(f"Invalid instrument type: {inst_type}")
             return []
         
+        # Serve from cache while fresh
+        cache_key = (inst_type, uly, inst_family, inst_id)
+        cached = self._instruments_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return list(cached[1])
+        
         # Build parameters
         params = {"instType": inst_type}
         
@@ -176,11 +268,90 @@ class OkxRestClient:
         if response.get("code") == "0" and "data" in response:
             instruments = response["data"]
             logger.info(f"Fetched {len(instruments)} {inst_type} instruments from OKX")
-            return instruments
+            if self.cache_ttl > 0:
+                self._instruments_cache[cache_key] = (time.monotonic() + self.cache_ttl, instruments)
+            return list(instruments)
             
         # Return empty list on error
         return []
     
+    def iter_instruments(self, inst_type: str) -> Iterator[Dict]:
+        """
+        Iterate over instruments of a type, streaming the response when possible.
+        Fresh cached instruments are served directly; otherwise, if ijson is installed,
+        instruments are parsed one at a time from the response body instead of
+        materializing the whole (multi-MB for SWAP) document first. A fully streamed
+        successful response is cached like get_instruments() results.
+        
+        Args:
+            inst_type: Instrument type (SPOT, MARGIN, SWAP, FUTURES, OPTION)
+            
+        Yields:
+            Instrument data dictionaries
+        """
+        cache_key = (inst_type, None, None, None)
+        cached = self._instruments_cache.get(cache_key)
+        if ijson is None or (cached and cached[0] > time.monotonic()):
+            yield from self.get_instruments(inst_type=inst_type)
+            return
+        
+        endpoint = "/api/v5/public/instruments"
+        
+        # Apply rate limiting
+        self._rate_limit(endpoint)
+        
+        url = f"{self.base_url}{endpoint}"
+        params = {"instType": inst_type}
+        
+        logger.info(f"Streaming {inst_type} instruments from OKX")
+        instruments = []
+        code = msg = None
+        try:
+            with self.session.get(url, params=params, headers=self._get_headers(endpoint, "GET"),
+                                  stream=True) as response:
+                response.raise_for_status()
+                # Let urllib3 undo any gzip/deflate encoding while ijson reads
+                response.raw.decode_content = True
+                
+                # Walk the parse events so the top-level code and msg are seen alongside
+                # the instruments, building each "data" item as it completes
+                builder = None
+                for prefix, event, value in ijson.parse(response.raw):
+                    if builder is not None:
+                        builder.event(event, value)
+                        if prefix == "data.item" and event == "end_map":
+                            instrument = builder.value
+                            builder = None
+                            instruments.append(instrument)
+                            yield instrument
+                    elif prefix == "data.item" and event == "start_map":
+                        # OKX sends code first; an error response carries no instruments
+                        if code not in (None, "0"):
+                            continue
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    elif prefix == "code":
+                        code = value
+                    elif prefix == "msg":
+                        msg = value
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error: {e}")
+            logger.error(f"URL: {url}, Parameters: {params}")
+            return
+        except ijson.JSONError as e:
+            logger.error(f"Error parsing response: {e}")
+            return
+        
+        # Check for API errors, as _request does for get_instruments
+        if code != "0":
+            logger.error(f"API error: {msg or 'Unknown error'}")
+            logger.error(f"Request: GET {url} {params}")
+            return
+        
+        logger.info(f"Fetched {len(instruments)} {inst_type} instruments from OKX")
+        if self.cache_ttl > 0:
+            self._instruments_cache[cache_key] = (time.monotonic() + self.cache_ttl, instruments)
+    
     def get_perpetual_symbols(self) -> List[str]:
         """
         Get all perpetual swap symbols from OKX.
@@ -188,20 +359,15 @@ class OkxRestClient:
         Returns:
             List of symbol strings in standard format (BASE-USDT)
         """
-        instruments = self.get_instruments(inst_type="SWAP")
-        
-        # Filter for perpetual swaps (perpetual futures)
-        perpetual_symbols = []
-        for instrument in instruments:
-            inst_id = instrument.get("instId", "")
-            
-            # Check if it's a perpetual swap (no expiry time)
-            if not instrument.get("expTime") and inst_id.endswith("-USDT-SWAP"):
-                # Extract the trading pair part and convert to standard format
-                base_ccy = instrument.get("baseCcy", "")
-                if base_ccy:
-                    standard_symbol = f"{base_ccy}-USDT"
-                    perpetual_symbols.append(standard_symbol)
+        # Filter for USDT perpetual swaps (no expiry time) while instruments stream in,
+        # converting to standard format
+        perpetual_symbols = [
+            f"{base_ccy}-USDT"
+            for instrument in self.iter_instruments("SWAP")
+            if (base_ccy := instrument.get("baseCcy"))
+            and instrument.get("instId", "").endswith("-USDT-SWAP")
+            and not instrument.get("expTime")
+        ]
         
         logger.info(f"Found {len(perpetual_symbols)} perpetual swap symbols on OKX")
         return perpetual_symbols
@@ -234,6 +400,25 @@ class OkxRestClient:
                 "nextFundingTime": str(int(time.time() * 1000) + 28800000)  # 8 hours from now
             }
 
+    def get_funding_rates(self, inst_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get funding rates for several instruments concurrently.
+        Requests overlap on pooled connections while still respecting the rate limit.
+        
+        Args:
+            inst_ids: Instrument IDs like "BTC-USDT-SWAP"
+            
+        Returns:
+            Dictionary mapping instrument ID to funding rate information
+        """
+        if not inst_ids:
+            return {}
+        
+        max_workers = min(self.MAX_CONCURRENT_REQUESTS, len(inst_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self.get_funding_rate, inst_ids)
+            return dict(zip(inst_ids, results))
+
     def get_instrument_id_mapping(self) -> Dict[str, str]:
         """
         Get a mapping from standard symbol format to OKX instrument ID format.
@@ -241,30 +426,33 @@ class OkxRestClient:
         Returns:
             Dict mapping standard symbols (e.g. "BTC-USDT") to OKX instId (e.g. "BTC-USDT-SWAP")
         """
+        # Serve from cache while fresh
+        if self._mapping_cache and self._mapping_cache[0] > time.monotonic():
+            return dict(self._mapping_cache[1])
+        
         instruments = self.get_instruments(inst_type="SWAP")
         
-        # Create mapping from standard symbol to OKX instrument ID
-        mappings = {}
-        for inst in instruments:
-            inst_id = inst.get("instId", "")
-            base_ccy = inst.get("baseCcy", "")
-            
-            if not base_ccy or not inst_id or not inst_id.endswith("-USDT-SWAP"):
-                continue
-                
-            # Standard format (with hyphen)
-            standard_symbol = f"{base_ccy}-USDT"
-            mappings[standard_symbol] = inst_id
-            
-            # Also add format without hyphen
-            standard_symbol_no_hyphen = f"{base_ccy}USDT" 
-            mappings[standard_symbol_no_hyphen] = inst_id
+        # Collect (base currency, instrument ID) pairs for USDT swaps in a single pass
+        pairs = [
+            (base_ccy, inst_id)
+            for inst in instruments
+            if (base_ccy := inst.get("baseCcy"))
+            and (inst_id := inst.get("instId", "")).endswith("-USDT-SWAP")
+        ]
+        
+        # Map both the standard format (with hyphen) and the format without hyphen
+        mappings = {f"{base_ccy}-USDT": inst_id for base_ccy, inst_id in pairs}
+        mappings.update({f"{base_ccy}USDT": inst_id for base_ccy, inst_id in pairs})
         
-        return mappings
+        if mappings and self.cache_ttl > 0:
+            self._mapping_cache = (time.monotonic() + self.cache_ttl, mappings)
+        return dict(mappings)
     
     def close(self):
-        """Close the session."""
-        self.session.close()
+        """Release the shared session (closed once no client uses it)."""
+        if not self._session_released:
+            self._session_released = True
+            self._release_session()
         logger.info("OKX REST client session closed")
 
 
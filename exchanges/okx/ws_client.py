@@ -3,88 +3,249 @@ import time
 import websocket
 import threading
 import logging
-import binascii
-from typing import Dict, List, Callable, Optional, Union, Any
+from collections import deque
+from itertools import islice, zip_longest
+from typing import Dict, List, Callable, Optional, Union, Any, ClassVar, FrozenSet
 from dataclasses import dataclass, field
+from sortedcontainers import SortedDict
+
+# Prefer ISA-L's CRC32 (carry-less multiply folding) over zlib's table-driven one
+try:
+    from isal.isal_zlib import crc32 as _crc32
+except ImportError:
+    from binascii import crc32 as _crc32
+
+# Prefer orjson for the message hot path, falling back to the stdlib json module
+try:
+    import orjson
+    
+    _loads = orjson.loads
+    
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _dumps = json.dumps
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("OkxWebSocketClient")
 
 # Global data storage
-order_books = {}
 funding_rates = {} # Add storage for funding rates
 
-@dataclass
+# Valid orderbook channels, for O(1) membership checks when subscribing and on the message path
+_BOOK_CHANNELS: FrozenSet[str] = frozenset({"books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt"})
+
+# Orderbook channels whose messages carry a checksum
+_CHECKSUM_CHANNELS: FrozenSet[str] = frozenset({"books", "books50-l2-tbt", "books-l2-tbt"})
+
+# Constant heartbeat frames, serialized once
+_PING_FRAME = b'{"op":"ping"}'
+_PONG_FRAME = b'{"op":"pong"}'
+
+# Shared read-only default for missing "arg" objects
+_EMPTY = {}
+
+# Inbox marker asking the consumer thread to verify book checksums; books are only
+# read and mutated on the consumer thread, so verification and resyncs run there too
+_VERIFY_CHECKSUMS = object()
+
+@dataclass(slots=True, eq=False)
 class OrderBookLevel:
-    """Represents a single level in the orderbook"""
+    """
+    Represents a single level in the orderbook. Slotted, so levels carry no per-instance __dict__.
+    Levels inside an OrderBook are recycled through the book's freelist; its read methods return
+    copies, so levels handed to callers are never mutated.
+    """
     price: float
     quantity: float
     order_count: int
     price_string: str
     quantity_string: str
     order_count_string: str
+    # Encoded once here so checksums can join bytes directly
+    price_bytes: bytes = field(init=False, repr=False, compare=False)
+    quantity_bytes: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.price_bytes = self.price_string.encode()
+        self.quantity_bytes = self.quantity_string.encode()
 
-    @staticmethod
-    def _is_valid_operand(other):
-        return (hasattr(other, "price") and
-                hasattr(other, "quantity"))
+    def copy(self) -> "OrderBookLevel":
+        """
+        Return an independent copy of this level.
+        """
+        return OrderBookLevel(self.price, self.quantity, self.order_count,
+                              self.price_string, self.quantity_string, self.order_count_string)
 
     def __lt__(self, other):
-        if not self._is_valid_operand(other):
+        try:
+            return self.price < other.price
+        except AttributeError:
             return NotImplemented
-        return self.price < other.price
 
     def __eq__(self, other):
-        if not self._is_valid_operand(other):
+        try:
+            return self.price == other.price
+        except AttributeError:
             return NotImplemented
-        return self.price == other.price
+
+
+def _parse_levels(level_infos: List[List[str]]) -> List[OrderBookLevel]:
+    """
+    Build OrderBookLevel objects from raw [price, quantity, liquidated_orders, order_count] rows.
+    Converts column by column with map() so float/int dispatch runs in C instead of per-cell bytecode.
+    """
+    if not level_infos:
+        return []
+    price_strings, quantity_strings, _, order_count_strings = zip(*level_infos)
+    return list(map(
+        OrderBookLevel,
+        map(float, price_strings),
+        map(float, quantity_strings),
+        map(int, order_count_strings),
+        price_strings,
+        quantity_strings,
+        order_count_strings,
+    ))
 
 
 @dataclass
 class OrderBook:
-    """Represents an orderbook for a specific instrument"""
+    """
+    Represents an orderbook for a specific instrument.
+    Each side is a SortedDict keyed so that iteration starts at the best level:
+    bids by negated price, asks by price. Upserts and deletes are O(log N).
+    Levels replaced or removed by an update are recycled through a per-book freelist,
+    which only the thread applying updates to this book touches.
+    """
+    # Maximum number of recycled levels kept per book
+    _POOL_SIZE: ClassVar[int] = 1024
+
     inst_id: str
-    _bids: List[OrderBookLevel] = field(default_factory=lambda: list())
-    _asks: List[OrderBookLevel] = field(default_factory=lambda: list())
+    _bids: SortedDict = field(default_factory=SortedDict)
+    _asks: SortedDict = field(default_factory=SortedDict)
     timestamp: int = 0
     exch_check_sum: int = 0
+    _pool: List[OrderBookLevel] = field(default_factory=list, repr=False, compare=False)
+
+    def _acquire(self, price: float, quantity: float, order_count: int,
+                 price_string: str, quantity_string: str, order_count_string: str) -> OrderBookLevel:
+        """
+        Return a level with the given fields, reusing a recycled instance when one is available.
+        """
+        try:
+            level = self._pool.pop()
+        except IndexError:
+            return OrderBookLevel(price, quantity, order_count, price_string, quantity_string, order_count_string)
+        level.price = price
+        level.quantity = quantity
+        level.order_count = order_count
+        level.price_string = price_string
+        level.quantity_string = quantity_string
+        level.order_count_string = order_count_string
+        level.price_bytes = price_string.encode()
+        level.quantity_bytes = quantity_string.encode()
+        return level
+
+    def _release(self, level: OrderBookLevel):
+        """
+        Hand a level that is no longer in this book back to the freelist.
+        """
+        pool = self._pool
+        if len(pool) < self._POOL_SIZE:
+            pool.append(level)
 
     def set_bids_on_snapshot(self, order_book_level_list: List[OrderBookLevel]):
-        self._bids = sorted(order_book_level_list, reverse=True)
+        self._replace_side(self._bids, ((-level.price, level) for level in order_book_level_list))
 
     def set_asks_on_snapshot(self, order_book_level_list: List[OrderBookLevel]):
-        self._asks = sorted(order_book_level_list, reverse=False)
+        self._replace_side(self._asks, ((level.price, level) for level in order_book_level_list))
+
+    def _replace_side(self, side: SortedDict, items):
+        # Refill the existing SortedDict instead of allocating a new one per snapshot, and hand
+        # the outgoing levels to the freelist so the updates that follow reuse them
+        release = self._release
+        for level in side.values():
+            release(level)
+        side.clear()
+        # Bulk update of an empty SortedDict sorts the keys once rather than inserting one by one
+        side.update(items)
 
     def set_bids_on_update(self, order_book_level: OrderBookLevel):
-        if not self._bids or self._bids[-1] > order_book_level:
-            self._bids.append(order_book_level)
-        else:
-            for i in range(len(self._bids)):
-                if order_book_level > self._bids[i]:
-                    self._bids.insert(i, order_book_level)
-                    break
-                elif order_book_level == self._bids[i]:
-                    if order_book_level.quantity == 0:
-                        self._bids.pop(i)
-                    else:
-                        self._bids[i] = order_book_level
-                    break
+        if order_book_level.quantity == 0:
+            self.set_bids_delete(order_book_level.price)
+            return
+        key = -order_book_level.price
+        replaced = self._bids.get(key)
+        self._bids[key] = order_book_level
+        if replaced is not None:
+            self._release(replaced)
 
     def set_asks_on_update(self, order_book_level: OrderBookLevel):
-        if not self._asks or self._asks[-1] < order_book_level:
-            self._asks.append(order_book_level)
-        else:
-            for i in range(len(self._asks)):
-                if order_book_level < self._asks[i]:
-                    self._asks.insert(i, order_book_level)
-                    break
-                elif order_book_level == self._asks[i]:
-                    if order_book_level.quantity == 0:
-                        self._asks.pop(i)
-                    else:
-                        self._asks[i] = order_book_level
-                    break
+        if order_book_level.quantity == 0:
+            self.set_asks_delete(order_book_level.price)
+            return
+        key = order_book_level.price
+        replaced = self._asks.get(key)
+        self._asks[key] = order_book_level
+        if replaced is not None:
+            self._release(replaced)
+
+    def set_bids_delete(self, price: float):
+        level = self._bids.pop(-price, None)
+        if level is not None:
+            self._release(level)
+
+    def set_asks_delete(self, price: float):
+        level = self._asks.pop(price, None)
+        if level is not None:
+            self._release(level)
+
+    def update_bids(self, level_infos: List[List[str]]):
+        """
+        Apply raw [price, quantity, liquidated_orders, order_count] update rows to the bid side.
+        """
+        self._apply_updates(self._bids, level_infos, -1.0)
+
+    def update_asks(self, level_infos: List[List[str]]):
+        """
+        Apply raw [price, quantity, liquidated_orders, order_count] update rows to the ask side.
+        """
+        self._apply_updates(self._asks, level_infos, 1.0)
+
+    def _apply_updates(self, side: SortedDict, level_infos: List[List[str]], sign: float):
+        # One fused loop per message: the side's methods and the freelist are bound once,
+        # so each level costs a parse and a dict operation rather than several method calls
+        pop = side.pop
+        get = side.get
+        acquire = self._acquire
+        release = self._release
+        for level_info in level_infos:
+            price = float(level_info[0])
+            quantity = float(level_info[1])
+            key = sign * price
+            if quantity == 0:
+                # Deletes only need the price; no level object is built for them
+                replaced = pop(key, None)
+            else:
+                replaced = get(key)
+                side[key] = acquire(
+                    price, quantity, int(level_info[3]),
+                    level_info[0], level_info[1], level_info[3],
+                )
+            if replaced is not None:
+                release(replaced)
+
+    def reset(self):
+        """
+        Empty both sides and forget the exchange checksum until the next snapshot arrives.
+        """
+        self._replace_side(self._bids, ())
+        self._replace_side(self._asks, ())
+        self.exch_check_sum = 0
 
     def set_timestamp(self, timestamp: int):
         self.timestamp = timestamp
@@ -93,17 +254,16 @@ class OrderBook:
         self.exch_check_sum = checksum
 
     def _current_check_sum(self):
-        bid_ask_string = ""
-        for i in range(max(len(self._bids), len(self._asks))):
-            if len(self._bids) > i:
-                bid_ask_string += f"{self._bids[i].price_string}:{self._bids[i].quantity_string}:"
-            if len(self._asks) > i:
-                bid_ask_string += f"{self._asks[i].price_string}:{self._asks[i].quantity_string}:"
-            if i + 1 >= 25:
-                break
-        if bid_ask_string:
-            bid_ask_string = bid_ask_string[:-1]
-        crc = binascii.crc32(bid_ask_string.encode()) & 0xffffffff  # Calculate CRC32 as unsigned integer
+        # Walk the top 25 levels of both sides in one pass, interleaving bid and ask;
+        # iterating avoids the positional lookups that indexing a SortedDict view costs
+        parts = []
+        extend = parts.extend
+        for bid, ask in zip_longest(islice(self._bids.values(), 25), islice(self._asks.values(), 25)):
+            if bid is not None:
+                extend((bid.price_bytes, bid.quantity_bytes))
+            if ask is not None:
+                extend((ask.price_bytes, ask.quantity_bytes))
+        crc = _crc32(b":".join(parts)) & 0xffffffff  # Calculate CRC32 as unsigned integer
         crc_signed = crc if crc < 0x80000000 else crc - 0x100000000  # Convert to signed integer
         return crc_signed
 
@@ -119,19 +279,19 @@ class OrderBook:
 
     def best_bid(self) -> OrderBookLevel:
         self._check_empty_array(self._bids)
-        return self._bids[0]
+        return self._bids.peekitem(0)[1].copy()
 
     def best_ask(self) -> OrderBookLevel:
         self._check_empty_array(self._asks)
-        return self._asks[0]
+        return self._asks.peekitem(0)[1].copy()
 
     def best_bid_price(self) -> float:
         self._check_empty_array(self._bids)
-        return self._bids[0].price
+        return self._bids.peekitem(0)[1].price
 
     def best_ask_price(self) -> float:
         self._check_empty_array(self._asks)
-        return self._asks[0].price
+        return self._asks.peekitem(0)[1].price
 
     def bid_by_level(self, level: int) -> OrderBookLevel:
         self._check_empty_array(self._bids)
@@ -139,7 +299,7 @@ class OrderBook:
             level = 1
         if level > len(self._bids):
             level = 0
-        return self._bids[level - 1]
+        return self._bids.peekitem(level - 1)[1].copy()
 
     def ask_by_level(self, level: int) -> OrderBookLevel:
         self._check_empty_array(self._asks)
@@ -147,12 +307,12 @@ class OrderBook:
             level = 1
         if level > len(self._asks):
             level = 0
-        return self._asks[level - 1]
+        return self._asks.peekitem(level - 1)[1].copy()
 
     def middle_price(self):
         self._check_empty_array(self._bids)
         self._check_empty_array(self._asks)
-        return (self._bids[0].price + self._asks[0].price) / 2
+        return (self._bids.peekitem(0)[1].price + self._asks.peekitem(0)[1].price) / 2
 
 
 class OkxWebSocketClient:
@@ -169,11 +329,15 @@ class OkxWebSocketClient:
     WS_PUBLIC_TESTNET_URL = "wss://wspap.okx.com:8443/ws/v5/public?brokerId=9999"
     WS_PRIVATE_TESTNET_URL = "wss://wspap.okx.com:8443/ws/v5/private?brokerId=9999"
     
+    # Minimum seconds between warnings about frames dropped from a full inbox
+    DROP_LOG_INTERVAL = 5.0
+    
     def __init__(self, 
                  testnet: bool = False,
                  ping_interval: int = 20,
                  ping_timeout: int = 10,
-                 reconnect_interval: int = 5):
+                 reconnect_interval: int = 5,
+                 inbox_size: int = 8192):
         """
         Initialize the OKX WebSocket client.
         
@@ -182,6 +346,8 @@ class OkxWebSocketClient:
             ping_interval: Interval in seconds for sending ping messages
             ping_timeout: Timeout in seconds for ping response
             reconnect_interval: Interval in seconds to wait before reconnecting after a disconnect
+            inbox_size: Maximum number of received frames buffered for the consumer thread;
+                the oldest frame is dropped when it is full
         """
         self.testnet = testnet
         self.ping_interval = ping_interval
@@ -196,47 +362,125 @@ class OkxWebSocketClient:
         self.connected = False
         self.subscriptions = {}  # {symbol: channel}
         self.callbacks = {}  # Store callbacks for different channels and symbols
+        self.order_books = {}  # {inst_id: OrderBook}, owned by this client
         
         # Threading for ping/pong and reconnection
         self.ping_thread = None
         self.checksum_thread = None
-        self.thread_running = False
+        # Per-instrument checksum resync attempts and the earliest time of the next one
+        self._checksum_failures = {}
+        self._checksum_retry_at = {}
+        # Set to stop the current connection's ping and checksum threads; replaced on every open
+        self._stop_event = threading.Event()
+        
+        # Raw frames handed from the reader thread to the consumer thread, so slow
+        # parsing, book updates or callbacks never hold up socket reads
+        self._inbox = deque(maxlen=inbox_size)
+        self._inbox_event = threading.Event()
+        self._consumer_thread = None
+        self._consumer_running = False
+        
+        # Frames dropped from the full inbox, reported at most every DROP_LOG_INTERVAL
+        self._dropped_messages = 0
+        self._last_drop_log = 0.0
     
     def _on_message(self, ws, message):
         """
         Called when a message is received from the WebSocket server.
+        Only enqueues the raw frame; parsing and callbacks run on the consumer thread.
+        """
+        inbox = self._inbox
+        if len(inbox) == inbox.maxlen:
+            # The append below drops the oldest frame; only count it here, since warning
+            # for every frame would flood the log and slow the reader thread down further
+            self._dropped_messages += 1
+            now = time.monotonic()
+            if now - self._last_drop_log >= self.DROP_LOG_INTERVAL:
+                self._last_drop_log = now
+                logger.warning(f"Message inbox full ({inbox.maxlen}), {self._dropped_messages} messages dropped so far")
+        inbox.append(message)
+        self._inbox_event.set()
+    
+    def _start_consumer(self):
+        """
+        Start the consumer thread if it is not already running.
         """
+        consumer = self._consumer_thread
+        if consumer is not None and consumer.is_alive():
+            if self._consumer_running or consumer is threading.current_thread():
+                # Still running (or reconnecting from one of its own callbacks): keep it
+                self._consumer_running = True
+                return
+            # close() told it to stop; let it finish its current frame so exactly one
+            # consumer drains the inbox from here on
+            consumer.join()
+        self._consumer_running = True
+        self._consumer_thread = threading.Thread(target=self._consumer_loop)
+        self._consumer_thread.daemon = True
+        self._consumer_thread.start()
+    
+    def _consumer_loop(self):
+        """
+        Drain the inbox, parsing and dispatching each frame.
+        """
+        inbox = self._inbox
+        inbox_event = self._inbox_event
+        dispatch = self._dispatch
+        while self._consumer_running:
+            try:
+                message = inbox.popleft()
+            except IndexError:
+                inbox_event.clear()
+                # A frame may have arrived between popleft and clear
+                if not inbox:
+                    inbox_event.wait(1)
+                continue
+            dispatch(message)
+    
+    def _dispatch(self, message):
+        """
+        Parse a raw frame and route it to orderbook/funding rate processing and callbacks.
+        """
+        if message is _VERIFY_CHECKSUMS:
+            self._verify_checksums()
+            return
+        
         try:
             # Parse message
-            message_data = json.loads(message)
-            
-            # Handle ping messages
-            if "event" in message_data and message_data["event"] == "ping":
-                self._send_pong()
-                return
-
-            # Handle subscription confirmations
-            if "event" in message_data and message_data["event"] == "subscribe":
-                logger.info(f"Subscription confirmed: {message_data.get('arg', {})}")
-                return
+            message_data = _loads(message)
+        except ValueError:
+            # Covers both json and orjson decode errors
+            logger.error(f"Failed to decode message: {message}")
+            return
+        
+        try:
+            event = message_data.get("event")
+            if event is not None:
+                # Handle ping messages
+                if event == "ping":
+                    self._send_pong()
+                    return
+                
+                # Handle subscription confirmations
+                if event == "subscribe":
+                    logger.info(f"Subscription confirmed: {message_data.get('arg', {})}")
+                    return
             
-            # Process the orderbook data
-            self._process_orderbook_message(message_data)
+            arg = message_data.get("arg") or _EMPTY
+            channel = arg.get("channel", "")
             
-            # Process the funding rate data
-            self._process_funding_rate_message(message_data)
+            if channel in _BOOK_CHANNELS:
+                # Process the orderbook data
+                self._process_orderbook_message(message_data)
+            elif channel == "funding-rate":
+                # Process the funding rate data
+                self._process_funding_rate_message(message_data)
             
             # Call specific callback if registered
-            arg = message_data.get('arg', {})
-            channel = arg.get('channel', '')
-            inst_id = arg.get('instId', '')
+            callback = self.callbacks.get(f"{channel}:{arg.get('instId', '')}")
+            if callback is not None:
+                callback(message_data)
             
-            callback_key = f"{channel}:{inst_id}"
-            if callback_key in self.callbacks:
-                self.callbacks[callback_key](message_data)
-            
-        except json.JSONDecodeError:
-            logger.error(f"Failed to decode message: {message}")
         except Exception as e:
             logger.error(f"Error processing message: {e}")
     
@@ -251,7 +495,7 @@ class OkxWebSocketClient:
         Called when the WebSocket connection is closed.
         """
         self.connected = False
-        self.thread_running = False
+        self._stop_event.set()
         
         # Log closure details
         if close_status_code or close_msg:
@@ -269,13 +513,14 @@ class OkxWebSocketClient:
         self.connected = True
         logger.info(f"WebSocket connection established to {self.ws_url}")
         
-        # Start the ping thread
-        self.thread_running = True
-        self.ping_thread = threading.Thread(target=self._ping_loop)
+        # Start the ping thread with a fresh stop event so threads from a previous connection stay stopped
+        self._stop_event = threading.Event()
+        self.ping_thread = threading.Thread(target=self._ping_loop, args=(self._stop_event,))
         self.ping_thread.daemon = True
         self.ping_thread.start()
         
-        # Start checksum verification thread
+        # Start checksum verification thread (if any subscription needs it)
+        self.checksum_thread = None
         self._start_checksum_thread()
         
         # Resubscribe to all topics if there were any
@@ -290,38 +535,32 @@ class OkxWebSocketClient:
             time.sleep(self.reconnect_interval)
             self.connect()
     
-    def _ping_loop(self):
+    def _ping_loop(self, stop_event: threading.Event):
         """
         Send ping messages at regular intervals to keep the connection alive.
+        
+        Args:
+            stop_event: Event that ends the loop when set
         """
         ping_count = 0
-        while self.thread_running:
+        while not stop_event.is_set():
             try:
                 if self.connected:
-                    ping_message = json.dumps({
-                        "op": "ping"
-                    })
-                    self.ws.send(ping_message)
+                    self.ws.send(_PING_FRAME)
                     logger.debug(f"Ping sent ({ping_count})")
                     ping_count += 1
             except Exception as e:
                 logger.error(f"Error sending ping: {e}")
                 
-            # Sleep for ping interval
-            for _ in range(self.ping_interval):
-                if not self.thread_running:
-                    break
-                time.sleep(1)
+            # Sleep for ping interval, waking immediately on stop
+            stop_event.wait(self.ping_interval)
     
     def _send_pong(self):
         """
         Send a pong response to the server's ping.
         """
         try:
-            pong_message = json.dumps({
-                "op": "pong"
-            })
-            self.ws.send(pong_message)
+            self.ws.send(_PONG_FRAME)
             logger.debug("Pong sent")
         except Exception as e:
             logger.error(f"Error sending pong: {e}")
@@ -330,76 +569,54 @@ class OkxWebSocketClient:
         """
         Process orderbook snapshot or update message and update internal state.
         """
-        arg = message.get("arg")
-        if not arg or not arg.get("channel"):
+        arg = message.get("arg") or _EMPTY
+        if arg.get("channel") not in _BOOK_CHANNELS or message.get("event") == "subscribe":
             return
-        if message.get("event") == "subscribe":
+        
+        inst_id = arg.get("instId")
+        action = message.get("action")
+        data_list = message.get("data")
+        if not data_list:
             return
+        data = data_list[0]
         
-        if arg.get("channel") in ["books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt"]:
-            inst_id = arg.get("instId")
-            action = message.get("action")
-            
-            if inst_id not in order_books:
-                order_books[inst_id] = OrderBook(inst_id=inst_id)
-            
-            data = message.get("data")[0]
-            
+        # Look the book up once; every operation below reuses it
+        ob = self.order_books.get(inst_id)
+        if ob is None:
+            ob = self.order_books[inst_id] = OrderBook(inst_id=inst_id)
+        
+        try:
             # Process asks
-            if data.get("asks"):
+            asks = data.get("asks")
+            if asks:
                 if action == "snapshot" or not action:
-                    ask_list = [OrderBookLevel(
-                        price=float(level_info[0]),
-                        quantity=float(level_info[1]),
-                        order_count=int(level_info[3]),
-                        price_string=level_info[0],
-                        quantity_string=level_info[1],
-                        order_count_string=level_info[3],
-                    ) for level_info in data["asks"]]
-                    order_books[inst_id].set_asks_on_snapshot(ask_list)
+                    ob.set_asks_on_snapshot(_parse_levels(asks))
                 if action == "update":
-                    for level_info in data["asks"]:
-                        order_books[inst_id].set_asks_on_update(
-                            OrderBookLevel(
-                                price=float(level_info[0]),
-                                quantity=float(level_info[1]),
-                                order_count=int(level_info[3]),
-                                price_string=level_info[0],
-                                quantity_string=level_info[1],
-                                order_count_string=level_info[3],
-                            )
-                        )
+                    ob.update_asks(asks)
             
             # Process bids
-            if data.get("bids"):
+            bids = data.get("bids")
+            if bids:
                 if action == "snapshot" or not action:
-                    bid_list = [OrderBookLevel(
-                        price=float(level_info[0]),
-                        quantity=float(level_info[1]),
-                        order_count=int(level_info[3]),
-                        price_string=level_info[0],
-                        quantity_string=level_info[1],
-                        order_count_string=level_info[3],
-                    ) for level_info in data["bids"]]
-                    order_books[inst_id].set_bids_on_snapshot(bid_list)
+                    ob.set_bids_on_snapshot(_parse_levels(bids))
                 if action == "update":
-                    for level_info in data["bids"]:
-                        order_books[inst_id].set_bids_on_update(
-                            OrderBookLevel(
-                                price=float(level_info[0]),
-                                quantity=float(level_info[1]),
-                                order_count=int(level_info[3]),
-                                price_string=level_info[0],
-                                quantity_string=level_info[1],
-                                order_count_string=level_info[3],
-                            )
-                        )
-            
-            # Update timestamp and checksum
-            if data.get("ts"):
-                order_books[inst_id].set_timestamp(int(data["ts"]))
-            if data.get("checksum"):
-                order_books[inst_id].set_exch_check_sum(data["checksum"])
+                    ob.update_bids(bids)
+        except (ValueError, TypeError, IndexError) as e:
+            # A malformed level may leave the book partly updated, so it is resynced
+            # like a checksum mismatch rather than trusted
+            logger.error(f"Malformed orderbook levels for {inst_id}: {e}")
+            now = time.monotonic()
+            if now >= self._checksum_retry_at.get(inst_id, 0):
+                self._resync_orderbook(inst_id, ob, now, reason="Malformed levels")
+            return
+        
+        # Update timestamp and checksum
+        ts = data.get("ts")
+        if ts:
+            ob.set_timestamp(int(ts))
+        checksum = data.get("checksum")
+        if checksum:
+            ob.set_exch_check_sum(checksum)
     
     def _process_funding_rate_message(self, message):
         """
@@ -442,10 +659,14 @@ class OkxWebSocketClient:
         """
         Connect to the OKX WebSocket server.
         """
+        self._start_consumer()
+        
         try:
             logger.info(f"Connecting to OKX WebSocket at {self.ws_url}")
             
-            # Create WebSocket using standard websocket library
+            # Create WebSocket using standard websocket library. It never offers the
+            # permessage-deflate extension, so frames arrive uncompressed and the reader
+            # thread does no inflate work
             self.ws = websocket.WebSocketApp(
                 self.ws_url,
                 on_message=self._on_message,
@@ -454,8 +675,12 @@ class OkxWebSocketClient:
                 on_open=self._on_open
             )
             
-            # Start WebSocket connection in a separate thread
-            self.ws_thread = threading.Thread(target=self.ws.run_forever)
+            # Start WebSocket connection in a separate thread. Skipping UTF-8 validation also
+            # skips decoding, so text frames reach _on_message as raw bytes for _loads
+            self.ws_thread = threading.Thread(
+                target=self.ws.run_forever,
+                kwargs={"skip_utf8_validation": True}
+            )
             self.ws_thread.daemon = True
             self.ws_thread.start()
             
@@ -467,74 +692,102 @@ class OkxWebSocketClient:
         """
         Resubscribe to all previous subscriptions after reconnection.
         """
+        # One request per channel, covering all of its instruments
+        by_channel = {}
         for symbol, channel in self.subscriptions.items():
-            if channel in ["books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt"]:
-                self._subscribe_orderbook(symbol, channel)
-            elif channel == "trades":
-                self.subscribe_trades(symbol)
-            elif channel == "funding-rate":
-                self.subscribe_funding_rate(symbol)
+            by_channel.setdefault(channel, []).append(symbol)
+        for channel, symbols in by_channel.items():
+            self._send_op("subscribe", channel, symbols)
     
-    def subscribe_orderbook(self, symbol: str, depth: str = "books5", callback: Optional[Callable] = None):
+    def _send_op(self, op: str, channel: str, symbol: Union[str, List[str]]) -> bool:
         """
-        Subscribe to orderbook updates for a specific symbol.
+        Send a subscribe or unsubscribe request for one channel and one or more instruments.
         
         Args:
-            symbol: Symbol to subscribe to (e.g., "BTC-USDT")
-            depth: Depth channel ("books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt")
-            callback: Optional callback function for processing messages
+            op: "subscribe" or "unsubscribe"
+            channel: Channel name (e.g., "books5", "trades", "funding-rate")
+            symbol: Instrument ID (e.g., "BTC-USDT"), or a list of them to send in one request
         
         Returns:
-            bool: True if subscription was successful, False otherwise
+            bool: True if the request was sent, False otherwise
         """
-        if depth not in ["books", "books5", "bbo-tbt", "books-l2-tbt", "books50-l2-tbt"]:
-            logger.error(f"Invalid depth channel: {depth}")
+        if not self.connected:
+            logger.warning(f"Not connected, cannot {op}")
             return False
         
-        # Store the callback if provided
-        if callback:
-            callback_key = f"{depth}:{symbol}"
-            self.callbacks[callback_key] = callback
-        
-        # Store subscription for reconnection
-        self.subscriptions[symbol] = depth
+        symbols = [symbol] if isinstance(symbol, str) else symbol
+        try:
+            # Serialized rather than templated, so caller-supplied IDs are always escaped
+            self.ws.send(_dumps({
+                "op": op,
+                "args": [{"channel": channel, "instId": s} for s in symbols]
+            }))
+            if op == "subscribe":
+                logger.info(f"Subscribed to {channel} for {symbol}")
+            else:
+                logger.info(f"Unsubscribed from {channel} for {symbol}")
+            return True
+        except Exception as e:
+            logger.error(f"Error sending {op} for {channel} {symbol}: {e}")
+            return False
+    
+    def _subscribe(self, channel: str, symbol: Union[str, List[str]], callback: Optional[Callable] = None) -> bool:
+        """
+        Record subscriptions (and their callback) and subscribe if connected, otherwise connect first.
+        Several instruments are subscribed with a single request.
+        """
+        symbols = [symbol] if isinstance(symbol, str) else symbol
+        for inst_id in symbols:
+            # Store the callback if provided
+            if callback:
+                self.callbacks[f"{channel}:{inst_id}"] = callback
+            
+            # Store subscription for reconnection
+            self.subscriptions[inst_id] = channel
         
         # Subscribe if connected
         if self.connected:
-            return self._subscribe_orderbook(symbol, depth)
-        else:
-            # Connect first
-            self.connect()
-            return True
+            if channel in _CHECKSUM_CHANNELS:
+                self._start_checksum_thread()
+            return self._send_op("subscribe", channel, symbol)
+        
+        # Connect first; the subscription is sent from _resubscribe once open
+        self.connect()
+        return True
     
-    def _subscribe_orderbook(self, symbol: str, channel: str):
+    def _unsubscribe(self, channel: str, symbol: str) -> bool:
         """
-        Internal method to subscribe to orderbook channel.
+        Unsubscribe from a channel and drop its subscription record and callback.
         """
-        try:
-            if not self.connected:
-                logger.warning("Not connected, cannot subscribe")
-                return False
-            
-            # Prepare subscription args
-            request = {
-                "op": "subscribe",
-                "args": [
-                    {
-                        "channel": channel,
-                        "instId": symbol
-                    }
-                ]
-            }
-            
-            # Send subscription request
-            self.ws.send(json.dumps(request))
-            logger.info(f"Subscribed to {channel} for {symbol}")
-            return True
+        if not self._send_op("unsubscribe", channel, symbol):
+            return False
         
-        except Exception as e:
-            logger.error(f"Error subscribing to {channel} for {symbol}: {e}")
+        # Remove from our records
+        if self.subscriptions.get(symbol) == channel:
+            del self.subscriptions[symbol]
+        
+        # Remove callback if registered
+        self.callbacks.pop(f"{channel}:{symbol}", None)
+        return True
+    
+    def subscribe_orderbook(self, symbol: Union[str, List[str]], depth: str = "books5", callback: Optional[Callable] = None):
+        """
+        Subscribe to orderbook updates for one or more symbols.
+        
+        Args:
+            symbol: Symbol to subscribe to (e.g., "BTC-USDT"), or a list of symbols to
+                subscribe in a single request
+            depth: Depth channel ("books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt")
+            callback: Optional callback function for processing messages
+        
+        Returns:
+            bool: True if subscription was successful, False otherwise
+        """
+        if depth not in _BOOK_CHANNELS:
+            logger.error(f"Invalid depth channel: {depth}")
             return False
+        
+        return self._subscribe(depth, symbol, callback)
     
     def subscribe_trades(self, symbol: str, callback: Optional[Callable] = None):
         """
@@ -547,41 +800,7 @@ class OkxWebSocketClient:
         Returns:
             bool: True if subscription was successful, False otherwise
         """
-        channel = "trades"
-        
-        # Store the callback if provided
-        if callback:
-            callback_key = f"{channel}:{symbol}"
-            self.callbacks[callback_key] = callback
-        
-        # Store subscription for reconnection
-        self.subscriptions[symbol] = channel
-        
-        # Subscribe if connected
-        if self.connected:
-            try:
-                # Prepare subscription args
-                request = {
-                    "op": "subscribe",
-                    "args": [
-                        {
-                            "channel": channel,
-                            "instId": symbol
-                        }
-                    ]
-                }
-                
-                # Send subscription request
-                self.ws.send(json.dumps(request))
-                logger.info(f"Subscribed to {channel} for {symbol}")
-                return True
-            except Exception as e:
-                logger.error(f"Error subscribing to {channel} for {symbol}: {e}")
-                return False
-        else:
-            # Connect first
-            self.connect()
-            return True
+        return self._subscribe("trades", symbol, callback)
     
     def subscribe_funding_rate(self, symbol: str, callback: Optional[Callable] = None):
         """
@@ -594,8 +813,6 @@ class OkxWebSocketClient:
         Returns:
             bool: True if subscription was successful, False otherwise
         """
-        channel = "funding-rate"
-        
         # Convert standard symbol format to OKX instrument ID if needed
         if not symbol.endswith("-SWAP"):
             # If it's in standard format like BTC-USDT, convert to BTC-USDT-SWAP
@@ -608,193 +825,91 @@ class OkxWebSocketClient:
                 symbol = f"{base}-USDT-SWAP"
         
         logger.info(f"Subscribing to OKX funding rate for {symbol}")
-        
-        # Store the callback if provided
-        if callback:
-            callback_key = f"{channel}:{symbol}"
-            self.callbacks[callback_key] = callback
-        
-        # Store subscription for reconnection
-        self.subscriptions[symbol] = channel
-        
-        # Subscribe if connected
-        if self.connected:
-            try:
-                # Prepare subscription args
-                request = {
-                    "op": "subscribe",
-                    "args": [
-                        {
-                            "channel": channel,
-                            "instId": symbol
-                        }
-                    ]
-                }
-                
-                # Send subscription request
-                self.ws.send(json.dumps(request))
-                logger.info(f"Subscribed to {channel} for {symbol}")
-                return True
-            except Exception as e:
-                logger.error(f"Error subscribing to {channel} for {symbol}: {str(e)}")
-                return False
-        else:
-            # Connect first
-            self.connect()
-            return True
+        return self._subscribe("funding-rate", symbol, callback)
     
     def unsubscribe_orderbook(self, symbol: str, depth: str = "books5"):
         """
         Unsubscribe from orderbook updates.
         """
-        if not self.connected:
-            logger.warning("Cannot unsubscribe, not connected")
-            return False
-        
-        try:
-            # Prepare unsubscription request
-            request = {
-                "op": "unsubscribe",
-                "args": [
-                    {
-                        "channel": depth,
-                        "instId": symbol
-                    }
-                ]
-            }
-            
-            # Send unsubscription request
-            self.ws.send(json.dumps(request))
-            
-            # Remove from our records
-            if symbol in self.subscriptions:
-                del self.subscriptions[symbol]
-            
-            # Remove callback if registered
-            callback_key = f"{depth}:{symbol}"
-            if callback_key in self.callbacks:
-                del self.callbacks[callback_key]
-            
-            logger.info(f"Unsubscribed from {depth} for {symbol}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error unsubscribing from {depth} for {symbol}: {e}")
-            return False
+        return self._unsubscribe(depth, symbol)
     
     def unsubscribe_trades(self, symbol: str):
         """
         Unsubscribe from trade updates.
         """
-        if not self.connected:
-            logger.warning("Cannot unsubscribe, not connected")
-            return False
-        
-        channel = "trades"
-        try:
-            # Prepare unsubscription request
-            request = {
-                "op": "unsubscribe",
-                "args": [
-                    {
-                        "channel": channel,
-                        "instId": symbol
-                    }
-                ]
-            }
-            
-            # Send unsubscription request
-            self.ws.send(json.dumps(request))
-            
-            # Remove from our records
-            if symbol in self.subscriptions:
-                del self.subscriptions[symbol]
-            
-            # Remove callback if registered
-            callback_key = f"{channel}:{symbol}"
-            if callback_key in self.callbacks:
-                del self.callbacks[callback_key]
-            
-            logger.info(f"Unsubscribed from {channel} for {symbol}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error unsubscribing from {channel} for {symbol}: {e}")
-            return False
+        return self._unsubscribe("trades", symbol)
     
     def unsubscribe_funding_rate(self, symbol: str):
         """
         Unsubscribe from funding rate updates.
         """
-        if not self.connected:
-            logger.warning("Cannot unsubscribe, not connected")
-            return False
-        
-        channel = "funding-rate"
-        try:
-            # Prepare unsubscription request
-            request = {
-                "op": "unsubscribe",
-                "args": [
-                    {
-                        "channel": channel,
-                        "instId": symbol
-                    }
-                ]
-            }
-            
-            # Send unsubscription request
-            self.ws.send(json.dumps(request))
-            
-            # Remove from our records
-            if symbol in self.subscriptions and self.subscriptions[symbol] == channel:
-                del self.subscriptions[symbol]
-            
-            # Remove callback if registered
-            callback_key = f"{channel}:{symbol}"
-            if callback_key in self.callbacks:
-                del self.callbacks[callback_key]
-            
-            logger.info(f"Unsubscribed from {channel} for {symbol}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error unsubscribing from {channel} for {symbol}: {e}")
-            return False
+        return self._unsubscribe("funding-rate", symbol)
     
     def _start_checksum_thread(self):
         """
-        Start a thread to verify checksums periodically.
+        Start a thread to verify checksums periodically, unless one is already running for
+        this connection or no subscribed channel carries checksums (books5 and bbo-tbt don't).
         """
-        self.thread_running = True
-        self.checksum_thread = threading.Thread(target=self._checksum_verification_loop)
+        if self.checksum_thread is not None:
+            return
+        if _CHECKSUM_CHANNELS.isdisjoint(self.subscriptions.values()):
+            return
+        self.checksum_thread = threading.Thread(target=self._checksum_verification_loop, args=(self._stop_event,))
         self.checksum_thread.daemon = True
         self.checksum_thread.start()
     
-    def _checksum_verification_loop(self):
+    def _checksum_verification_loop(self, stop_event: threading.Event):
         """
-        Periodically verify checksums and reconnect if needed.
+        Periodically ask the consumer thread to verify checksums of all books.
+        
+        Args:
+            stop_event: Event that ends the loop when set
         """
-        while self.thread_running:
-            try:
-                for inst_id, order_book in order_books.items():
-                    if not order_book.do_check_sum():
-                        logger.warning(f"Checksum mismatch for {inst_id}, reconnecting...")
-                        
-                        # Get the channel for this symbol
-                        channel = self.subscriptions.get(inst_id, "books5")
-                        
-                        # Unsubscribe and resubscribe
-                        self.unsubscribe_orderbook(inst_id, channel)
-                        time.sleep(1)
-                        self.subscribe_orderbook(inst_id, channel)
-                        break
-                    
-            except Exception as e:
-                logger.error(f"Error in checksum verification: {e}")
+        while not stop_event.is_set():
+            # Queue the check behind pending frames rather than touching books from this thread
+            self._inbox.append(_VERIFY_CHECKSUMS)
+            self._inbox_event.set()
                 
-            # Sleep before next check
-            time.sleep(5)
+            # Sleep before next check, waking immediately on stop
+            stop_event.wait(5)
+    
+    def _verify_checksums(self):
+        """
+        Verify checksums of all books and resync any that mismatch. Runs on the consumer thread.
+        """
+        try:
+            now = time.monotonic()
+            for inst_id, order_book in list(self.order_books.items()):
+                # Books without a checksum (books5, bbo-tbt, or reset and awaiting a snapshot) are skipped
+                if not order_book.exch_check_sum:
+                    continue
+                if order_book.do_check_sum():
+                    self._checksum_failures.pop(inst_id, None)
+                    continue
+                if now < self._checksum_retry_at.get(inst_id, 0):
+                    continue
+                self._resync_orderbook(inst_id, order_book, now)
+                
+        except Exception as e:
+            logger.error(f"Error in checksum verification: {e}")
+    
+    def _resync_orderbook(self, inst_id: str, order_book: OrderBook, now: float,
+                          reason: str = "Checksum mismatch"):
+        """
+        Drop a corrupted book and re-subscribe its channel so OKX sends a fresh snapshot.
+        Retries for the same instrument back off exponentially, up to 60 seconds.
+        Must run on the consumer thread, which owns all book mutations.
+        """
+        failures = self._checksum_failures.get(inst_id, 0) + 1
+        self._checksum_failures[inst_id] = failures
+        self._checksum_retry_at[inst_id] = now + min(60, 2 ** failures)
+        logger.warning(f"{reason} for {inst_id} (attempt {failures}), resyncing...")
+        
+        # Only this instrument's book is reset; subscription records and callbacks are kept
+        order_book.reset()
+        channel = self.subscriptions.get(inst_id, "books5")
+        if self._send_op("unsubscribe", channel, inst_id):
+            self._send_op("subscribe", channel, inst_id)
     
     def get_data(self, symbol: Optional[str] = None):
         """
@@ -808,8 +923,8 @@ class OkxWebSocketClient:
         """
         if symbol:
             try:
-                if symbol in order_books:
-                    order_book = order_books[symbol]
+                if symbol in self.order_books:
+                    order_book = self.order_books[symbol]
                     
                     # Extract best bid and ask
                     best_bid = order_book.best_bid()
@@ -830,7 +945,7 @@ class OkxWebSocketClient:
         else:
             # Format all symbols to match the get_data return format of other clients
             result = {}
-            for sym, order_book in order_books.items():
+            for sym, order_book in self.order_books.items():
                 try:
                     # Extract best bid and ask
                     best_bid = order_book.best_bid()
@@ -896,16 +1011,13 @@ class OkxWebSocketClient:
         """
         Close the WebSocket connection.
         """
-        self.thread_running = False
+        self._stop_event.set()
+        self._consumer_running = False
+        self._inbox_event.set()
         if self.ws:
             # Unsubscribe from all topics
             for symbol, channel in list(self.subscriptions.items()):
-                if channel in ["books5", "books", "bbo-tbt", "books50-l2-tbt", "books-l2-tbt"]:
-                    self.unsubscribe_orderbook(symbol, channel)
-                elif channel == "trades":
-                    self.unsubscribe_trades(symbol)
-                elif channel == "funding-rate":
-                    self.unsubscribe_funding_rate(symbol)
+                self._unsubscribe(channel, symbol)
             
             # Close connection
             self.ws.close()
@@ -1,14 +1,16 @@
 import threading
+import queue
+import numpy as np
 import pandas as pd
 import time
 import logging
-import os
 import sys
+from dataclasses import dataclass
 from IPython.display import display, clear_output
 from exchanges.binance.ws_client import BinanceWebSocketClient
 from exchanges.bybit.ws_client import BybitWebSocketClient
 from exchanges.okx.ws_client import OkxWebSocketClient
-from terminal_display import (format_exchange_comparison_table, 
+from terminal_display import (format_comparison_table, 
                              print_comparison_header, print_arbitrage_alerts,
                              is_color_supported)
 
@@ -19,6 +21,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger("MultiExchangeComparison")
 
+# Exchanges in display order; also the exchange axis of the price array
+EXCHANGE_NAMES = ("Binance", "Bybit", "OKX")
+
+@dataclass(slots=True)
+class Tick:
+    """Top of the book for one symbol on one exchange, as stored by the orderbook handlers"""
+    symbol: str
+    bid: float
+    ask: float
+    bid_qty: float
+    ask_qty: float
+    timestamp: float
+
+# Notebook table styles, shared by every update
+_TABLE_STYLES = [
+    {'selector': 'th', 'props': [('background-color', '#4472C4'), 
+                              ('color', 'white'),
+                              ('font-weight', 'bold'),
+                              ('border', '1px solid #4472C4')]},
+    {'selector': 'td', 'props': [('border', '1px solid #ddd')]},
+    {'selector': 'tr:nth-child(even)', 'props': [('background-color', '#f2f2f2')]},
+    {'selector': 'tr:hover', 'props': [('background-color', '#e6f7ff')]},
+]
+
+def _comparison_cell_styles(df):
+    """Compute the CSS for every cell of the comparison table in one vectorized pass"""
+    styles = pd.DataFrame('', index=df.index, columns=df.columns)
+    
+    # Highlight arbitrage opportunities, their direction and profit
+    if 'Arbitrage' in df.columns:
+        styles['Arbitrage'] = np.where(df['Arbitrage'] == 'Yes', 'background-color: #c6efce', '')
+    if 'Direction' in df.columns:
+        styles['Direction'] = np.where(df['Direction'] != '-', 'background-color: #c6efce', '')
+    if 'Profit (bps)' in df.columns:
+        styles['Profit (bps)'] = np.where(df['Profit (bps)'] > 0, 'color: green; font-weight: bold', '')
+    return styles
+
 class MultiExchangeComparison:
     def __init__(self, symbols, update_interval=1.0):
         """
@@ -36,8 +75,55 @@ class MultiExchangeComparison:
         self.bybit_client = BybitWebSocketClient(channel_type="linear", testnet=False)
         self.okx_client = OkxWebSocketClient(testnet=False, ping_interval=20, reconnect_interval=5)
         
-        # Display thread
+        # Detect environment; notebooks get a styled DataFrame, terminals a plain table
+        try:
+            get_ipython
+            self._in_notebook = True
+        except NameError:
+            self._in_notebook = False
+        
+        # Symbol conversions to and from OKX instrument IDs, looked up per message
+        self._to_okx = {symbol: self._to_okx_symbol(symbol) for symbol in self.symbols}
+        self._from_okx = {okx_symbol: symbol for symbol, okx_symbol in self._to_okx.items()}
+        
+        # Notebook number formats, keyed by the table's column tuple
+        self._format_cache = {}
+        
+        # Latest [symbol, exchange, bid/ask] prices, reused on every display update
+        self._prices = np.empty((len(self.symbols), len(EXCHANGE_NAMES), 2))
+        
+        # Per-symbol arbitrage columns, rewritten in place on every display update
+        self._arb_flags = np.full(len(self.symbols), 'No', dtype=object)
+        self._directions = np.full(len(self.symbols), '-', dtype=object)
+        self._profits = np.zeros(len(self.symbols))
+        
+        # Row positions and "Buy X, Sell Y" labels by [buy, sell] exchange index, for the
+        # vectorized arbitrage search
+        self._symbol_index = np.arange(len(self.symbols))
+        self._direction_labels = np.array(
+            [[f"Buy {buy}, Sell {sell}" for sell in EXCHANGE_NAMES] for buy in EXCHANGE_NAMES],
+            dtype=object
+        )
+        
+        # Comparison table built once as views over the arrays above, so updates never
+        # go through the DataFrame constructor
+        columns = {'Symbol': np.array(self.symbols, dtype=object)}
+        for j, name in enumerate(EXCHANGE_NAMES):
+            columns[f'{name} Bid'] = self._prices[:, j, 0]
+            columns[f'{name} Ask'] = self._prices[:, j, 1]
+        columns['Arbitrage'] = self._arb_flags
+        columns['Direction'] = self._directions
+        columns['Profit (bps)'] = self._profits
+        self._df = pd.DataFrame(columns, copy=False)
+        
+        # Count of Bybit/OKX orderbook updates, and the data version last displayed
+        self._version = 0
+        self._rendered_version = None
+        
+        # Display thread, and the render thread that draws its latest snapshot
         self.display_thread = None
+        self.render_thread = None
+        self._render_queue = queue.Queue(maxsize=1)
         self.running = True
         
     def _to_okx_symbol(self, symbol):
@@ -59,322 +145,310 @@ class MultiExchangeComparison:
         """Process orderbook data from Bybit"""
         try:
             if message.get('type') in ['snapshot', 'delta']:
-                symbol = message['data']['s']
+                data = message['data']
+                symbol = data['s']
                 
                 # Extract best bid and ask
-                bids = message['data']['b']  # bids array
-                asks = message['data']['a']  # asks array
+                bids = data['b']  # bids array
+                asks = data['a']  # asks array
                 
                 if bids and asks:
-                    best_bid = float(bids[0][0])
-                    best_ask = float(asks[0][0])
-                    bid_qty = float(bids[0][1])
-                    ask_qty = float(asks[0][1])
-                    
-                    # Check if data attribute exists, initialize if needed
-                    if not hasattr(self.bybit_client, 'data'):
-                        self.bybit_client.data = {}
+                    b0 = bids[0]
+                    a0 = asks[0]
                     
                     # Store data directly in the client for consistent access
-                    self.bybit_client.data[symbol] = {
-                        'symbol': symbol,
-                        'bid': best_bid,
-                        'ask': best_ask,
-                        'bid_qty': bid_qty,
-                        'ask_qty': ask_qty,
-                        'timestamp': time.time()
-                    }
-        except Exception as e:
-            logger.error(f"Error processing Bybit data: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+                    self.bybit_client.data[symbol] = Tick(
+                        symbol, float(b0[0]), float(a0[0]), float(b0[1]), float(a0[1]), time.time()
+                    )
+                    self._version += 1
+        except (KeyError, IndexError, ValueError, TypeError):
+            # Malformed message; logger.exception only formats the traceback if it is emitted
+            logger.exception("Error processing Bybit data")
     
     def handle_okx_orderbook(self, message):
         """Process orderbook data from OKX"""
+        # The OKX book schema is fixed, so index directly; a message without it (such
+        # as a subscribe event or an empty push) is not an orderbook update. books5
+        # pushes carry no "action" and are full snapshots, so a missing action counts
+        # as a snapshot
+        if message.get("action") not in (None, "snapshot", "update"):
+            return
         try:
-            arg = message.get("arg", {})
-            inst_id = arg.get("instId", "")
-            action = message.get("action", "")
+            inst_id = message["arg"]["instId"]
+            data = message["data"][0]
             
-            if action in ["snapshot", "update"] and message.get("data"):
-                data = message.get("data")[0]
-                
-                # Extract best bid and ask
-                bids = data.get("bids", [])
-                asks = data.get("asks", [])
-                
-                if bids and asks:
-                    best_bid = float(bids[0][0])
-                    best_ask = float(asks[0][0])
-                    bid_qty = float(bids[0][1])
-                    ask_qty = float(asks[0][1])
-                    
-                    # Store data in standard format
-                    std_symbol = self._from_okx_symbol(inst_id)
-                    
-                    # Store data 
-                    if not hasattr(self.okx_client, 'data'):
-                        self.okx_client.data = {}
-                    
-                    self.okx_client.data[std_symbol] = {
-                        'symbol': std_symbol,
-                        'bid': best_bid,
-                        'ask': best_ask,
-                        'bid_qty': bid_qty,
-                        'ask_qty': ask_qty,
-                        'timestamp': time.time()
-                    }
-        except Exception as e:
-            logger.error(f"Error processing OKX data: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            # Extract best bid and ask
+            bids = data["bids"]
+            asks = data["asks"]
+        except (KeyError, IndexError):
+            return
+        
+        if not (bids and asks):
+            return
+        
+        try:
+            b0 = bids[0]
+            a0 = asks[0]
+            
+            # Store data in standard format
+            std_symbol = self._from_okx.get(inst_id) or self._from_okx_symbol(inst_id)
+            self.okx_client.data[std_symbol] = Tick(
+                std_symbol, float(b0[0]), float(a0[0]), float(b0[1]), float(a0[1]), time.time()
+            )
+            self._version += 1
+        except (IndexError, ValueError, TypeError):
+            logger.exception("Error processing OKX data")
     
     def start(self):
         """Start monitoring all exchanges"""
         logger.info("Starting multi-exchange comparison tool...")
         
-        # Connect to all exchanges
-        self.binance_client.connect()
+        # Stores written by the orderbook callbacks, created up front so the handlers
+        # never have to check for them
+        self.bybit_client.data = {}
+        self.okx_client.data = {}
         
-        self.bybit_client.connect()
-        for symbol in self.symbols:
-            self.bybit_client.subscribe_orderbook(
-                symbol=symbol, 
-                depth=1,
-                callback=self.handle_bybit_orderbook
-            )
+        # Connect to all exchanges in parallel, so startup waits for the slowest
+        # handshake rather than all of them in turn
+        connectors = [
+            threading.Thread(target=self.binance_client.connect),
+            threading.Thread(target=self._connect_bybit),
+            threading.Thread(target=self._connect_okx),
+        ]
+        for connector in connectors:
+            connector.daemon = True
+            connector.start()
         
-        self.okx_client.connect()
-        for symbol in self.symbols:
-            okx_symbol = self._to_okx_symbol(symbol)
-            self.okx_client.subscribe_orderbook(
-                symbol=okx_symbol,
-                depth="books5",
-                callback=self.handle_okx_orderbook  # Add the callback handler
-            )
+        deadline = time.monotonic() + 10
+        for connector in connectors:
+            connector.join(timeout=max(0, deadline - time.monotonic()))
         
-        # Wait for connections and initial data
+        # Wait until every exchange has sent data, for at most 5 seconds
         logger.info("Waiting for initial data...")
-        time.sleep(5)
+        deadline = time.monotonic() + 5
+        while not self._has_initial_data() and time.monotonic() < deadline:
+            time.sleep(0.05)
         
         # Start display thread
         self.display_thread = threading.Thread(target=self.update_display)
         self.display_thread.daemon = True
         self.display_thread.start()
         
+        self.render_thread = threading.Thread(target=self._render_loop)
+        self.render_thread.daemon = True
+        self.render_thread.start()
+        
         logger.info("Multi-exchange comparison tool started")
     
+    def _connect_bybit(self):
+        """Connect to Bybit and subscribe to all symbols"""
+        # Subscribe every symbol in one request per exchange; the handlers route
+        # messages by the symbol they carry
+        self.bybit_client.connect()
+        self.bybit_client.subscribe_orderbook(
+            symbol=self.symbols, 
+            depth=1,
+            callback=self.handle_bybit_orderbook
+        )
+    
+    def _connect_okx(self):
+        """Connect to OKX and subscribe to all symbols"""
+        self.okx_client.connect()
+        self.okx_client.subscribe_orderbook(
+            symbol=list(self._to_okx.values()),
+            depth="books5",
+            callback=self.handle_okx_orderbook  # Add the callback handler
+        )
+    
+    def _has_initial_data(self):
+        """Check whether every exchange has delivered at least one quote"""
+        return bool(self.binance_client.get_spot_data() and self.bybit_client.data and self.okx_client.data)
+    
     def update_display(self):
         """Update the comparison display"""
+        # Schedule updates against fixed deadlines so slow iterations don't push back
+        # every following one
+        next_update = time.monotonic()
         while self.running:
-            try:
-                # Get data from all exchanges
-                binance_data = self.binance_client.get_data()
-                bybit_data = self.bybit_client.get_data()
-                
-                # Get OKX data and convert symbols to standard format
-                okx_raw_data = self.okx_client.get_data()
-                okx_data = {}
-                for okx_symbol, data in okx_raw_data.items():
-                    std_symbol = self._from_okx_symbol(okx_symbol)
-                    okx_data[std_symbol] = data
-                
-                # Create comparison data
-                comparison_data = []
-                
-                for symbol in self.symbols:
-                    # Get data for each exchange if available
-                    binance_ticker = binance_data.get(symbol, {})
-                    bybit_ticker = bybit_data.get(symbol, {})
-                    okx_ticker = okx_data.get(symbol, {})
-                    
-                    if not any([binance_ticker, bybit_ticker, okx_ticker]):
-                        continue
-                    
-                    # Calculate midpoints for each exchange where data is available
-                    exchanges = {}
-                    if binance_ticker:
-                        exchanges["Binance"] = {
-                            "bid": binance_ticker.get("bid", 0),
-                            "ask": binance_ticker.get("ask", 0),
-                            "mid": (binance_ticker.get("bid", 0) + binance_ticker.get("ask", 0)) / 2
-                        }
-                    
-                    if bybit_ticker:
-                        exchanges["Bybit"] = {
-                            "bid": bybit_ticker.get("bid", 0),
-                            "ask": bybit_ticker.get("ask", 0),
-                            "mid": (bybit_ticker.get("bid", 0) + bybit_ticker.get("ask", 0)) / 2
-                        }
+            # Only rebuild the comparison when an exchange has sent data since the last one
+            version = (self._version, self.binance_client.spot_updates)
+            if version != self._rendered_version:
+                self._rendered_version = version
+                try:
+                    # Get data from all exchanges
+                    binance_data = self.binance_client.get_spot_data()
+                    bybit_data = self.bybit_client.get_data()
                     
-                    if okx_ticker:
-                        exchanges["OKX"] = {
-                            "bid": okx_ticker.get("bid", 0),
-                            "ask": okx_ticker.get("ask", 0),
-                            "mid": (okx_ticker.get("bid", 0) + okx_ticker.get("ask", 0)) / 2
-                        }
+                    # The OKX handler already stores its data under standard symbols
+                    okx_data = self.okx_client.data
                     
-                    # Find best arbitrage opportunity
-                    best_arb = self._find_best_arbitrage(exchanges)
+                    # Collect (bid, ask) pairs per symbol in EXCHANGE_NAMES order as plain
+                    # tuples, then fill the [symbol, exchange, bid/ask] price array in one
+                    # assignment; NaN marks missing data
+                    missing = (np.nan, np.nan)
+                    binance_get = binance_data.get
+                    bybit_get = bybit_data.get
+                    okx_get = okx_data.get
+                    quotes = []
+                    for symbol in self.symbols:
+                        ticker = binance_get(symbol)
+                        bybit_tick = bybit_get(symbol)
+                        okx_tick = okx_get(symbol)
+                        quotes.append((
+                            (ticker.get("bid", 0), ticker.get("ask", 0)) if ticker else missing,
+                            (bybit_tick.bid, bybit_tick.ask) if bybit_tick is not None else missing,
+                            (okx_tick.bid, okx_tick.ask) if okx_tick is not None else missing,
+                        ))
+                    prices = self._prices
+                    prices[:] = quotes
                     
-                    # Create comparison row
-                    row = {
-                        'Symbol': symbol,
-                        'Arbitrage': 'Yes' if best_arb['profit_bps'] > 0 else 'No',
-                        'Profit (bps)': round(best_arb['profit_bps'], 2),
-                        'Direction': best_arb['direction']
-                    }
+                    present = ~np.isnan(prices[:, :, 0])
+                    rows = np.flatnonzero(present.any(axis=1))
                     
-                    # Add exchange data
-                    for exchange_name in ["Binance", "Bybit", "OKX"]:
-                        if exchange_name in exchanges:
-                            row[f'{exchange_name} Bid'] = exchanges[exchange_name]['bid']
-                            row[f'{exchange_name} Ask'] = exchanges[exchange_name]['ask']
-                            
-                    comparison_data.append(row)
-                
-                # Create and display DataFrame
-                if comparison_data:
-                    # Detect environment
-                    in_notebook = False
-                    try:
-                        get_ipython
-                        in_notebook = True
-                    except NameError:
-                        in_notebook = False
-                    
-                    # Clear screen based on environment
-                    if in_notebook:
-                        clear_output(wait=True)
+                    # Build and publish the comparison
+                    if len(rows):
+                        # Find best arbitrage opportunity for each symbol
+                        self._find_best_arbitrage(prices)
+                        
+                        # Symbols without data and exchanges without data for any symbol are left out
+                        shown = np.flatnonzero(present[rows].any(axis=0))
+                        columns = ['Symbol']
+                        for j in shown:
+                            columns += [f'{EXCHANGE_NAMES[j]} Bid', f'{EXCHANGE_NAMES[j]} Ask']
+                        columns += ['Arbitrage', 'Direction', 'Profit (bps)']
+                        
+                        if self._in_notebook:
+                            # The table already holds the new values; hand the render thread a
+                            # copy, since the shared table is overwritten on the next update
+                            if len(columns) == len(self._df.columns) and len(rows) == len(self.symbols):
+                                snapshot = self._df.copy()
+                            else:
+                                snapshot = self._df.loc[rows, columns].reset_index(drop=True)
+                        else:
+                            # The terminal only needs plain rows, so skip pandas altogether
+                            quotes = prices[np.ix_(rows, shown)].reshape(len(rows), -1).tolist()
+                            snapshot = (columns, [
+                                [self.symbols[i], *row_quotes, flag, direction, profit]
+                                for i, row_quotes, flag, direction, profit in zip(
+                                    rows, quotes, self._arb_flags[rows], self._directions[rows],
+                                    self._profits[rows].tolist()
+                                )
+                            ])
+                        
+                        # Stamped once for both the header and the caption
+                        self._publish(snapshot, time.strftime('%H:%M:%S'))
                     else:
-                        os.system('cls' if os.name == 'nt' else 'clear')
-                    
-                    # Create DataFrame
-                    df = pd.DataFrame(comparison_data)
-                    
-                    # Define column order
-                    columns = ['Symbol']
-                    for exchange in ["Binance", "Bybit", "OKX"]:
-                        columns.extend([f'{exchange} Bid', f'{exchange} Ask'])
-                    columns.extend(['Arbitrage', 'Direction', 'Profit (bps)'])
-                    
-                    # Reorder and filter columns that exist
-                    existing_columns = [col for col in columns if col in df.columns]
-                    df = df[existing_columns]
-                    
-                    if in_notebook:
-                        # Format for notebook
-                        self._display_notebook_table(df)
-                    else:
-                        # Format for terminal
-                        print_comparison_header(time.strftime('%H:%M:%S'))
-                        print_arbitrage_alerts(comparison_data)
-                        print(format_exchange_comparison_table(df))
-                else:
-                    print("Waiting for data from exchanges...")
-                    
-            except Exception as e:
-                logger.error(f"Error updating display: {e}")
-                import traceback
-                traceback.print_exc()
+                        self._publish(None, None)
+                        
+                except Exception:
+                    logger.exception("Error updating display")
+            
+            next_update += self.update_interval
+            delay = next_update - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Running behind; start the next update now instead of bursting to catch up
+                next_update = time.monotonic()
+    
+    def _publish(self, df, timestamp):
+        """Replace any snapshot the render thread has not picked up yet with the latest one"""
+        try:
+            self._render_queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._render_queue.put_nowait((df, timestamp))
+    
+    def _render_loop(self):
+        """Render published snapshots, keeping terminal I/O off the update thread"""
+        while self.running:
+            try:
+                df, timestamp = self._render_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
             
-            time.sleep(self.update_interval)
+            try:
+                self._render(df, timestamp)
+            except Exception:
+                logger.exception("Error rendering display")
     
-    def _find_best_arbitrage(self, exchanges):
+    def _render(self, snapshot, timestamp):
         """
-        Find the best arbitrage opportunity among the exchanges.
+        Draw one comparison snapshot, or a waiting message when there is no data yet.
         
         Args:
-            exchanges: Dict of exchange data with bid/ask prices
-            
-        Returns:
-            Dict containing best arbitrage details
+            snapshot: DataFrame in a notebook, (headers, rows) in a terminal, or None
+            timestamp: Time the snapshot was taken
         """
-        best_arb = {
-            'buy_exchange': None,
-            'sell_exchange': None, 
-            'profit': 0,
-            'profit_bps': 0,
-            'direction': '-'
-        }
-        
-        # Check all exchange pairs for arbitrage
-        exchange_names = list(exchanges.keys())
-        
-        for i, ex1 in enumerate(exchange_names):
-            for j, ex2 in enumerate(exchange_names):
-                if i == j:  # Skip same exchange
-                    continue
-                    
-                # Check if we can buy on ex1 and sell on ex2
-                if exchanges[ex1]['ask'] > 0 and exchanges[ex2]['bid'] > 0:
-                    profit = exchanges[ex2]['bid'] - exchanges[ex1]['ask']
-                    profit_bps = (profit / exchanges[ex1]['ask']) * 10000
-                    
-                    if profit_bps > best_arb['profit_bps']:
-                        best_arb = {
-                            'buy_exchange': ex1,
-                            'sell_exchange': ex2,
-                            'profit': profit,
-                            'profit_bps': profit_bps,
-                            'direction': f"Buy {ex1}, Sell {ex2}"
-                        }
-        
-        return best_arb
-    
-    def _display_notebook_table(self, df):
-        """Format and display table for Jupyter notebook"""
-        # Format the table with styling
-        format_dict = {}
+        if snapshot is None:
+            print("Waiting for data from exchanges...")
+            return
         
-        # Apply currency formatting to bid/ask columns
-        for col in df.columns:
-            if 'Bid' in col or 'Ask' in col:
-                format_dict[col] = "${:.2f}"
-                
-        # Format profit column
-        if 'Profit (bps)' in df.columns:
-            format_dict['Profit (bps)'] = "{:.2f}"
-            
-        styled_df = df.style.format(format_dict)
-        
-        # Add styling for arbitrage opportunities
-        if 'Arbitrage' in df.columns:
-            styled_df = styled_df.map(
-                lambda x: 'background-color: #c6efce' if x == 'Yes' else '',
-                subset=['Arbitrage']
-            )
+        if self._in_notebook:
+            # Format for notebook
+            clear_output(wait=True)
+            self._display_notebook_table(snapshot, timestamp)
+        else:
+            # Format for terminal; clear with ANSI escapes rather than spawning a shell
+            headers, rows = snapshot
+            sys.stdout.write('\x1b[2J\x1b[H')
+            print_comparison_header(timestamp)
+            print_arbitrage_alerts([dict(zip(headers, row)) for row in rows])
+            print(format_comparison_table(headers, rows))
+            sys.stdout.flush()
+    
+    def _find_best_arbitrage(self, prices):
+        """
+        Find the best arbitrage opportunity for every symbol at once, writing the
+        Arbitrage, Direction and Profit (bps) columns in place.
         
-        # Add styling for direction
-        if 'Direction' in df.columns:
-            styled_df = styled_df.map(
-                lambda x: 'background-color: #c6efce' if x != '-' else '',
-                subset=['Direction']
-            )
+        Args:
+            prices: Array of [symbol, exchange, bid/ask] prices; NaN marks missing data
+        """
+        # The best opportunity is always buying at the lowest ask and selling at the
+        # highest bid; missing and non-positive quotes can never be picked
+        bids = prices[:, :, 0]
+        asks = prices[:, :, 1]
+        with np.errstate(invalid='ignore'):
+            asks = np.where(asks > 0, asks, np.inf)
+            bids = np.where(bids > 0, bids, -np.inf)
+        buy = asks.argmin(axis=1)
+        sell = bids.argmax(axis=1)
+        min_ask = asks[self._symbol_index, buy]
+        max_bid = bids[self._symbol_index, sell]
         
-        # Add styling for profit
-        if 'Profit (bps)' in df.columns:
-            styled_df = styled_df.map(
-                lambda x: 'color: green; font-weight: bold' if x > 0 else '',
-                subset=['Profit (bps)']
-            )
+        # Only a profitable trade between two different exchanges counts
+        valid = np.isfinite(min_ask) & np.isfinite(max_bid) & (buy != sell)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            profit_bps = np.where(valid, (max_bid - min_ask) / min_ask * 10000, 0.0)
+        profitable = profit_bps > 0
         
-        # Set table styles
-        styled_df = styled_df.set_table_styles([
-            {'selector': 'th', 'props': [('background-color', '#4472C4'), 
-                                      ('color', 'white'),
-                                      ('font-weight', 'bold'),
-                                      ('border', '1px solid #4472C4')]},
-            {'selector': 'td', 'props': [('border', '1px solid #ddd')]},
-            {'selector': 'tr:nth-child(even)', 'props': [('background-color', '#f2f2f2')]},
-            {'selector': 'tr:hover', 'props': [('background-color', '#e6f7ff')]},
-        ])
+        self._arb_flags[:] = np.where(profitable, 'Yes', 'No')
+        self._directions[:] = np.where(profitable, self._direction_labels[buy, sell], '-')
+        self._profits[:] = np.where(profitable, np.round(profit_bps, 2), 0.0)
+    
+    def _display_notebook_table(self, df, timestamp):
+        """Format and display table for Jupyter notebook"""
+        # Format the table with styling; the format dict only changes with the column set
+        columns = tuple(df.columns)
+        format_dict = self._format_cache.get(columns)
+        if format_dict is None:
+            format_dict = self._format_cache[columns] = {
+                col: "${:.2f}" if col != 'Profit (bps)' else "{:.2f}"
+                for col in columns
+                if 'Bid' in col or 'Ask' in col or col == 'Profit (bps)'
+            }
         
-        # Set caption
-        styled_df = styled_df.set_caption(f"Multi-Exchange Comparison - {time.strftime('%H:%M:%S')}")
+        styled_df = (
+            df.style
+            .format(format_dict)
+            .apply(_comparison_cell_styles, axis=None)
+            .set_table_styles(_TABLE_STYLES)
+            .set_caption(f"Multi-Exchange Comparison - {timestamp}")
+        )
         
         # Print header
-        print(f"Multi-Exchange Comparison ({time.strftime('%H:%M:%S')})")
+        print(f"Multi-Exchange Comparison ({timestamp})")
         
         # Display the styled DataFrame
         display(styled_df)
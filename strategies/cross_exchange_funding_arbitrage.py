@@ -1,12 +1,32 @@
 import sys
 import time
+import json
+import hashlib
 import logging
 import traceback
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+# Optional Redis cache for symbol discovery results
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Prefer orjson for (de)serializing cached discovery results, falling back to the stdlib json module
+try:
+    import orjson
+    
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _dumps = json.dumps
+
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -20,8 +40,7 @@ from utils.config_loader import load_config
 from utils.exchange_utils import (
     fetch_binance_futures_symbols, 
     fetch_bybit_perpetual_symbols,
-    create_symbol_mappings,
-    filter_symbols
+    create_symbol_mappings
 )
 from utils.ws_manager import (
     initialize_all_websockets,
@@ -29,7 +48,8 @@ from utils.ws_manager import (
     close_all_websockets
 )
 from utils.metrics_calculator import (
-    calculate_funding_metrics,
+    calculate_funding_metrics_batch,
+    calculate_trading_costs,
     rank_opportunities,
     should_execute_arbitrage
 )
@@ -77,6 +97,8 @@ class CrossExchangeFundingArbitrageStrategy:
         # Load configuration parameters
         self.min_funding_spread = config.get('min_funding_spread', 0.0005)
         self.position_size_usd = config.get('position_size_usd', 1000)
+        # Fee and slippage costs only depend on the config, so compute them once
+        self.trading_costs = calculate_trading_costs(config)
         self.check_interval = config.get('check_interval', 30)
         self.max_positions = config.get('risk_management', {}).get('max_positions', 5)
         self.use_all_symbols = config.get('use_all_symbols', False)
@@ -87,14 +109,18 @@ class CrossExchangeFundingArbitrageStrategy:
         self.exchanges_to_use = [e.lower() for e in self.exchanges_to_use]
         
         # Symbol filters
-        self.exclude_symbols = [s.upper() for s in config.get('symbol_filters', {}).get('exclude', [])]
-        self.include_only = [s.upper() for s in config.get('symbol_filters', {}).get('include_only', [])]
+        self.exclude_symbols = frozenset(s.upper() for s in config.get('symbol_filters', {}).get('exclude', []))
+        self.include_only = frozenset(s.upper() for s in config.get('symbol_filters', {}).get('include_only', []))
         
         logger.info(f"Initializing strategy with exchanges: {', '.join(self.exchanges_to_use)}")
         
         # Initialize exchange clients
         self._initialize_exchange_clients()
         
+        # Optional Redis cache so restarts can skip symbol discovery
+        self.symbol_cache = self._connect_symbol_cache(config.get('redis_url'))
+        self.symbol_cache_ttl = config.get('symbol_cache_ttl', 3600)
+        
         # Discover common symbols across exchanges
         self._discover_common_symbols()
         
@@ -105,6 +131,11 @@ class CrossExchangeFundingArbitrageStrategy:
         self.metrics = {}
         self.opportunities = []
         
+        # Bybit REST tickers used when WebSocket data is missing, refreshed at most once per TTL
+        self.bybit_rest_cache_ttl = config.get('bybit_rest_cache_ttl', 3)
+        self._bybit_rest_cache = {}
+        self._bybit_rest_cache_time = 0
+        
         logger.info(f"Initialized cross-exchange funding arbitrage strategy with {len(self.symbols)} symbols")
         logger.info(f"Minimum funding spread threshold: {self.min_funding_spread}")
         logger.info(f"Maximum positions: {self.max_positions}")
@@ -120,37 +151,95 @@ class CrossExchangeFundingArbitrageStrategy:
             # This would be implemented if OKX REST client exists
             pass
     
-    def _discover_common_symbols(self):
-        """Discover common symbols across all exchanges"""
-        # Fetch symbols from each exchange
-        binance_symbols = []
-        bybit_symbols = []
-        okx_symbols = []
-        
-        if 'binance' in self.exchanges_to_use:
-            binance_symbols = fetch_binance_futures_symbols(
-                exclude_symbols=self.exclude_symbols,
-                include_only=self.include_only
-            )
+    def _connect_symbol_cache(self, redis_url):
+        """
+        Connect to the Redis instance used to cache symbol discovery results.
         
-        if 'bybit' in self.exchanges_to_use and hasattr(self, 'bybit_rest'):
-            bybit_symbols = fetch_bybit_perpetual_symbols(self.bybit_rest)
+        Args:
+            redis_url: Redis connection URL, or None to disable caching
+            
+        Returns:
+            Redis client, or None if caching is disabled or unavailable
+        """
+        if not redis_url:
+            return None
+        if redis is None:
+            logger.warning("redis_url is configured but the redis package is not installed; symbol caching disabled")
+            return None
         
-        if 'okx' in self.exchanges_to_use:
-            # Replace with actual API call when OKX client is available
-            from utils.exchange_utils import fetch_okx_perpetual_symbols
-            okx_symbols = fetch_okx_perpetual_symbols()
+        try:
+            # Bound the connect so an unreachable Redis cannot stall startup
+            client = redis.Redis.from_url(redis_url, socket_connect_timeout=2, socket_timeout=2)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"Could not connect to Redis, symbol caching disabled: {str(e)}")
+            return None
+    
+    def _symbol_cache_key(self):
+        """Build the cache key for the selected exchanges and symbol filters"""
+        filters = _dumps([sorted(self.exclude_symbols), sorted(self.include_only)])
+        if isinstance(filters, str):
+            filters = filters.encode()
+        digest = hashlib.sha1(filters).hexdigest()[:12]
+        return f"cefa:symmap:{':'.join(self.exchanges_to_use)}:{digest}"
+    
+    def _load_cached_symbols(self):
+        """
+        Load cached common symbols and mappings from Redis.
         
-        # Find common symbols and create mappings
-        self.available_symbols, self.symbol_mappings = create_symbol_mappings(
-            binance_symbols, bybit_symbols, okx_symbols
-        )
+        Returns:
+            Tuple of (available_symbols, symbol_mappings), or None on a miss or error
+        """
+        if self.symbol_cache is None:
+            return None
         
-        logger.info(f"Found {len(self.available_symbols)} common symbols across selected exchanges")
+        try:
+            blob = self.symbol_cache.get(self._symbol_cache_key())
+            if blob is None:
+                return None
+            cached = _loads(blob)
+            return cached['symbols'], cached['mappings']
+        except Exception as e:
+            logger.warning(f"Error reading cached symbols from Redis: {str(e)}")
+            return None
+    
+    def _store_cached_symbols(self):
+        """Store the discovered common symbols and mappings in Redis"""
+        if self.symbol_cache is None or not self.available_symbols:
+            return
         
-        # Filter symbols based on configuration
+        try:
+            blob = _dumps({'symbols': self.available_symbols, 'mappings': self.symbol_mappings})
+            self.symbol_cache.setex(self._symbol_cache_key(), self.symbol_cache_ttl, blob)
+        except Exception as e:
+            logger.warning(f"Error caching symbols in Redis: {str(e)}")
+    
+    def _discover_common_symbols(self):
+        """Discover common symbols across all exchanges"""
+        cached = self._load_cached_symbols()
+        if cached:
+            self.available_symbols, self.symbol_mappings = cached
+            logger.info(f"Loaded {len(self.available_symbols)} common symbols from cache")
+        elif self._fetch_common_symbols():
+            self._store_cached_symbols()
+        else:
+            logger.warning("Symbol discovery was incomplete, not caching the result")
+        
+        # Reverse mappings from exchange-specific symbols back to standard symbols
+        self.reverse_mappings = {
+            exchange: {
+                mapping[exchange]: std_symbol
+                for std_symbol, mapping in self.symbol_mappings.items()
+                if mapping.get(exchange)
+            }
+            for exchange in ('bybit', 'okx')
+        }
+        
+        # Select symbols based on configuration. Common symbols are built from the Binance
+        # list, which the exclude/include filters were already applied to while fetching
         if self.use_all_symbols:
-            self.symbols = filter_symbols(self.available_symbols, self.config)
+            self.symbols = list(self.available_symbols)
             logger.info(f"Using {len(self.symbols)} common symbols after filtering")
         else:
             # Use only the configured symbols that are available
@@ -163,6 +252,50 @@ class CrossExchangeFundingArbitrageStrategy:
             if unavailable:
                 logger.warning(f"The following configured symbols are not available on all exchanges: {unavailable}")
     
+    def _fetch_common_symbols(self):
+        """
+        Fetch symbols from each exchange and map the ones common to all of them.
+        
+        Returns:
+            True if every selected exchange returned symbols, False otherwise
+        """
+        # Fetch symbols from each exchange. The requests are independent, so they run
+        # concurrently and discovery takes as long as the slowest exchange
+        binance_future = bybit_future = okx_future = None
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            if 'binance' in self.exchanges_to_use:
+                binance_future = executor.submit(
+                    fetch_binance_futures_symbols,
+                    exclude_symbols=self.exclude_symbols,
+                    include_only=self.include_only
+                )
+            
+            if 'bybit' in self.exchanges_to_use and hasattr(self, 'bybit_rest'):
+                bybit_future = executor.submit(fetch_bybit_perpetual_symbols, self.bybit_rest)
+            
+            if 'okx' in self.exchanges_to_use:
+                # Replace with actual API call when OKX client is available
+                from utils.exchange_utils import fetch_okx_perpetual_symbols
+                okx_future = executor.submit(fetch_okx_perpetual_symbols)
+        
+        # The fetch helpers log failures and return an empty list themselves
+        binance_symbols = binance_future.result() if binance_future else []
+        bybit_symbols = bybit_future.result() if bybit_future else []
+        okx_symbols = okx_future.result() if okx_future else []
+        
+        # Find common symbols and create mappings
+        self.available_symbols, self.symbol_mappings = create_symbol_mappings(
+            binance_symbols, bybit_symbols, okx_symbols
+        )
+        
+        logger.info(f"Found {len(self.available_symbols)} common symbols across selected exchanges")
+        
+        # A transient empty response from one exchange would yield a broken mapping, so
+        # callers only treat the result as complete when every exchange answered
+        fetched = {'binance': binance_symbols, 'bybit': bybit_symbols, 'okx': okx_symbols}
+        return all(fetched[exchange] for exchange in self.exchanges_to_use if exchange in fetched)
+    
     def initialize_websockets(self):
         """Initialize WebSocket connections to exchanges"""
         # Initialize WebSockets using our utility function
@@ -174,11 +307,31 @@ class CrossExchangeFundingArbitrageStrategy:
         
         # Wait for initial data
         logger.info("Waiting for initial data...")
-        time.sleep(15)
+        self._wait_for_initial_data()
         
         # Verify data availability
         self._verify_data_availability()
     
+    def _wait_for_initial_data(self, min_fraction=0.5, timeout=15):
+        """
+        Wait until every connected exchange has data for enough of the symbols.
+        
+        Args:
+            min_fraction: Fraction of the symbol set each exchange must have data for
+            timeout: Maximum time to wait in seconds
+        """
+        required = min_fraction * len(self.symbols)
+        deadline = time.monotonic() + timeout
+        while True:
+            counts = {exchange: len(data) for exchange, data in self._snapshot_exchange_data().items()}
+            if all(count >= required for count in counts.values()):
+                logger.info(f"Initial data received: {counts}")
+                return
+            if time.monotonic() >= deadline:
+                logger.warning(f"Timed out after {timeout}s waiting for initial data: {counts}")
+                return
+            time.sleep(0.25)
+    
     def _verify_data_availability(self):
         """Verify that we're receiving data for the symbols"""
         # Track symbols with data from each exchange
@@ -193,22 +346,14 @@ class CrossExchangeFundingArbitrageStrategy:
         # Check Bybit data
         if 'bybit' in self.exchanges_to_use and 'bybit' in self.ws_clients:
             bybit_data = self.ws_clients['bybit'].get_ticker_data()
-            for bybit_symbol in bybit_data:
-                # Find the corresponding standard symbol
-                for std_symbol, mapping in self.symbol_mappings.items():
-                    if mapping.get('bybit') == bybit_symbol:
-                        data_available['bybit'].add(std_symbol)
-                        break
+            bybit_to_std = self.reverse_mappings['bybit']
+            data_available['bybit'] = {bybit_to_std[s] for s in bybit_data.keys() & bybit_to_std.keys()}
         
         # Check OKX data (when available)
         if 'okx' in self.exchanges_to_use and 'okx' in self.ws_clients:
             okx_data = self.ws_clients['okx'].get_funding_rate_data()
-            for okx_symbol in okx_data:
-                # Find the corresponding standard symbol
-                for std_symbol, mapping in self.symbol_mappings.items():
-                    if mapping.get('okx') == okx_symbol:
-                        data_available['okx'].add(std_symbol)
-                        break
+            okx_to_std = self.reverse_mappings['okx']
+            data_available['okx'] = {okx_to_std[s] for s in okx_data.keys() & okx_to_std.keys()}
         
         # Find symbols with data from all exchanges
         symbols_with_data = set(self.symbols)
@@ -226,17 +371,16 @@ class CrossExchangeFundingArbitrageStrategy:
                 logger.warning(f"Reducing symbol list from {len(self.symbols)} to {len(symbols_with_data)} symbols with available data")
                 self.symbols = list(symbols_with_data)
                 
-                # Update positions dictionary
-                new_positions = {}
+                # Update positions dictionary in place, dropping the removed symbols
+                for symbol in list(self.positions):
+                    if symbol not in symbols_with_data:
+                        del self.positions[symbol]
                 for symbol in self.symbols:
-                    if symbol in self.positions:
-                        new_positions[symbol] = self.positions[symbol]
-                    else:
-                        new_positions[symbol] = {
+                    if symbol not in self.positions:
+                        self.positions[symbol] = {
                             exchange: {'active': False, 'side': None, 'qty': 0, 'entry_time': None, 'entry_price': 0}
                             for exchange in self.exchanges_to_use
                         }
-                self.positions = new_positions
     
     def update_metrics(self):
         """Calculate and update metrics for all symbols"""
@@ -249,75 +393,140 @@ class CrossExchangeFundingArbitrageStrategy:
                 self.symbol_mappings
             )
         
-        new_metrics = {}
+        # Take each exchange's data map once per scan so per-symbol work is a plain lookup
+        snapshots = self._snapshot_exchange_data()
+        self._refresh_bybit_rest_cache(snapshots.get('bybit', {}))
         
+        # Gather each symbol's exchange data, keeping symbols with at least 2 exchanges
+        symbols = []
+        exchange_data_list = []
         for symbol in self.symbols:
-            try:
-                # Get data from each exchange
-                exchange_data = {}
-                
-                # Binance data
-                if 'binance' in self.exchanges_to_use and self.ws_connected.get('binance'):
-                    binance_data = self.ws_clients['binance'].get_mark_price(symbol)
-                    if binance_data:
-                        exchange_data['binance'] = binance_data
-                
-                # Bybit data with fallback to REST API
-                if 'bybit' in self.exchanges_to_use:
-                    bybit_symbol = self.symbol_mappings.get(symbol, {}).get('bybit')
-                    if bybit_symbol:
-                        bybit_data = None
-                        # Try WebSocket first if connected
-                        if self.ws_connected.get('bybit'):
-                            bybit_data = self.ws_clients['bybit'].get_ticker_data(bybit_symbol)
-                        
-                        # Fall back to REST API if needed
-                        if not bybit_data and hasattr(self, 'bybit_rest'):
-                            try:
-                                logger.debug(f"WebSocket data not available for {bybit_symbol}, trying REST API")
-                                bybit_data = self.bybit_rest.get_tickers(symbol=bybit_symbol)
-                                if bybit_data and len(bybit_data) > 0:
-                                    bybit_data = bybit_data[0]
-                            except Exception as e:
-                                logger.warning(f"Error fetching {bybit_symbol} data from Bybit REST API: {str(e)}")
-                        
-                        if bybit_data:
-                            exchange_data['bybit'] = bybit_data
-                    else:
-                        logger.debug(f"No Bybit mapping for {symbol}")
-                
-                # OKX data when available
-                if 'okx' in self.exchanges_to_use and self.ws_connected.get('okx'):
-                    okx_inst_id = self.symbol_mappings.get(symbol, {}).get('okx_instid')
-                    if okx_inst_id:
-                        okx_data = self.ws_clients['okx'].get_funding_rate_data(okx_inst_id)
-                        if okx_data:
-                            exchange_data['okx'] = okx_data
-                    else:
-                        logger.debug(f"No OKX mapping for {symbol}")
-                
-                # Calculate metrics based on available exchange data
-                if len(exchange_data) >= 2:  # Need at least 2 exchanges to calculate metrics
-                    metrics = calculate_funding_metrics(
-                        symbol=symbol,
-                        exchange_data=exchange_data,
-                        config=self.config
-                    )
-                    if metrics:
-                        new_metrics[symbol] = metrics
-                else:
-                    available = [ex for ex in exchange_data.keys()]
-                    logger.debug(f"Insufficient exchange data for {symbol}. Available: {available}")
-            except Exception as e:
-                logger.error(f"Error calculating metrics for {symbol}: {str(e)}")
-                logger.debug(traceback.format_exc())
-        
-        # Store the updated metrics
-        self.metrics = new_metrics
+            exchange_data = self._gather_exchange_data(symbol, snapshots)
+            if len(exchange_data) >= 2:
+                symbols.append(symbol)
+                exchange_data_list.append(exchange_data)
+            else:
+                available = [ex for ex in exchange_data.keys()]
+                logger.debug(f"Insufficient exchange data for {symbol}. Available: {available}")
+        
+        # Calculate and store metrics for all symbols in a single vectorized pass
+        self.metrics = calculate_funding_metrics_batch(
+            symbols=symbols,
+            exchange_data_list=exchange_data_list,
+            config=self.config,
+            trading_costs=self.trading_costs
+        )
         
         # Rank opportunities by profitability
         self.opportunities = rank_opportunities(self.metrics, self.min_funding_spread)
     
+    def _snapshot_exchange_data(self):
+        """
+        Fetch the full data map of each connected exchange in a single call.
+        
+        Returns:
+            Dictionary mapping exchange name to its symbol -> data map
+        """
+        snapshots = {}
+        if 'binance' in self.exchanges_to_use and self.ws_connected.get('binance'):
+            snapshots['binance'] = self.ws_clients['binance'].get_mark_price_data()
+        if 'bybit' in self.exchanges_to_use and self.ws_connected.get('bybit'):
+            snapshots['bybit'] = self.ws_clients['bybit'].get_ticker_data()
+        if 'okx' in self.exchanges_to_use and self.ws_connected.get('okx'):
+            snapshots['okx'] = self.ws_clients['okx'].get_funding_rate_data()
+        return snapshots
+    
+    def _fetch_bybit_all_tickers(self):
+        """
+        Fetch all Bybit linear tickers in a single REST call.
+        
+        Returns:
+            Dictionary mapping Bybit symbol to its ticker data
+        """
+        return {ticker['symbol']: ticker for ticker in self.bybit_rest.get_tickers(category="linear")}
+    
+    def _refresh_bybit_rest_cache(self, bybit_ws_data):
+        """
+        Refresh the Bybit REST ticker cache if WebSocket data is missing for any symbol.
+        
+        Args:
+            bybit_ws_data: Current Bybit WebSocket ticker map
+        """
+        if 'bybit' not in self.exchanges_to_use or not hasattr(self, 'bybit_rest'):
+            return
+        
+        if time.time() - self._bybit_rest_cache_time < self.bybit_rest_cache_ttl:
+            return
+        
+        missing = any(
+            mapping.get('bybit') and not bybit_ws_data.get(mapping['bybit'])
+            for mapping in (self.symbol_mappings.get(symbol, {}) for symbol in self.symbols)
+        )
+        if not missing:
+            return
+        
+        try:
+            logger.debug("WebSocket data not available for some Bybit symbols, fetching tickers from REST API")
+            self._bybit_rest_cache = self._fetch_bybit_all_tickers()
+        except Exception as e:
+            logger.warning(f"Error fetching tickers from Bybit REST API: {str(e)}")
+        self._bybit_rest_cache_time = time.time()
+    
+    def _gather_exchange_data(self, symbol, snapshots=None):
+        """
+        Gather the data available for one symbol from each exchange.
+        
+        Args:
+            symbol: Symbol in standard format
+            snapshots: Exchange data maps from _snapshot_exchange_data(); taken fresh if None
+            
+        Returns:
+            Dictionary mapping exchange name to its data for the symbol
+        """
+        if snapshots is None:
+            snapshots = self._snapshot_exchange_data()
+        
+        # Get data from each exchange
+        exchange_data = {}
+        try:
+            # Binance data
+            if 'binance' in snapshots:
+                binance_data = snapshots['binance'].get(symbol.upper())
+                if binance_data:
+                    exchange_data['binance'] = binance_data
+            
+            # Bybit data with fallback to REST API
+            if 'bybit' in self.exchanges_to_use:
+                bybit_symbol = self.symbol_mappings.get(symbol, {}).get('bybit')
+                if bybit_symbol:
+                    bybit_data = None
+                    # Try WebSocket first if connected
+                    if 'bybit' in snapshots:
+                        bybit_data = snapshots['bybit'].get(bybit_symbol)
+                    
+                    # Fall back to the batched REST tickers if needed
+                    if not bybit_data:
+                        bybit_data = self._bybit_rest_cache.get(bybit_symbol)
+                    
+                    if bybit_data:
+                        exchange_data['bybit'] = bybit_data
+                else:
+                    logger.debug(f"No Bybit mapping for {symbol}")
+            
+            # OKX data when available
+            if 'okx' in snapshots:
+                okx_inst_id = self.symbol_mappings.get(symbol, {}).get('okx_instid')
+                if okx_inst_id:
+                    okx_data = snapshots['okx'].get(okx_inst_id)
+                    if okx_data:
+                        exchange_data['okx'] = okx_data
+                else:
+                    logger.debug(f"No OKX mapping for {symbol}")
+        except Exception as e:
+            logger.error(f"Error gathering data for {symbol}: {str(e)}")
+            logger.debug(traceback.format_exc())
+        return exchange_data
+    
     def check_and_manage_positions(self):
         """
         Check existing positions and manage them based on current market conditions.
@@ -56,8 +56,8 @@ class FundingArbitrageStrategy:
         # Symbol filters
         self.min_price = config.get('symbol_filters', {}).get('min_price', 0)
         self.min_volume = config.get('symbol_filters', {}).get('min_volume_usd', 0)
-        self.exclude_symbols = [s.upper() for s in config.get('symbol_filters', {}).get('exclude', [])]
-        self.include_only = [s.upper() for s in config.get('symbol_filters', {}).get('include_only', [])]
+        self.exclude_symbols = frozenset(s.upper() for s in config.get('symbol_filters', {}).get('exclude', []))
+        self.include_only = frozenset(s.upper() for s in config.get('symbol_filters', {}).get('include_only', []))
         
         # Get all trading symbols if configured
         if self.use_all_symbols:
@@ -77,76 +77,79 @@ def format_with_color(value, format_spec='', color=None, condition=None):
     else:
         return f"{value:{format_spec}}"
 
-def format_exchange_comparison_table(df):
+def _comparison_cell_formatter(col, colored):
     """
-    Format a DataFrame for display in the terminal with colors and borders.
+    Get the function that formats the cells of one comparison table column.
     
     Args:
-        df: Pandas DataFrame with exchange comparison data
+        col: Column header
+        colored: Whether to add ANSI colors
         
     Returns:
-        Formatted string ready for terminal display
+        Formatting function, or None if the column's values are shown as they are
     """
-    # Make a copy to avoid modifying the original
-    formatted_df = df.copy()
-    
-    # Format numeric columns
-    if is_color_supported():
-        # Apply colors and formatting to specific columns
-        for col in formatted_df.columns:
-            if col == 'Symbol':
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"{Colors.BOLD}{x}{Colors.RESET}"
-                )
-            elif 'Bid' in col:
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"${x:.2f}"
-                )
-            elif 'Ask' in col:
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"${x:.2f}"
-                )
-            elif col == 'Mid Diff':
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"{Colors.GREEN}${x:.4f}{Colors.RESET}" if x > 0 else 
-                             (f"{Colors.RED}${x:.4f}{Colors.RESET}" if x < 0 else f"${x:.4f}")
-                )
-            elif col == 'Mid Diff (bps)':
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"{Colors.GREEN}{x:.2f}{Colors.RESET}" if x > 0 else 
-                             (f"{Colors.RED}{x:.2f}{Colors.RESET}" if x < 0 else f"{x:.2f}")
-                )
-            elif col == 'Arbitrage':
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"{Colors.BG_GREEN}{Colors.BLACK} {x} {Colors.RESET}" if x == 'Yes' else x
-                )
-            elif col == 'Direction':
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"{Colors.BOLD}{x}{Colors.RESET}" if x != '-' else x
-                )
-            elif col == 'Profit (bps)':
-                formatted_df[col] = formatted_df[col].apply(
-                    lambda x: f"{Colors.BOLD}{Colors.GREEN}{x:.2f}{Colors.RESET}" if x > 0 else f"{x:.2f}"
-                )
+    if colored:
+        if col == 'Symbol':
+            return lambda x: f"{Colors.BOLD}{x}{Colors.RESET}"
+        elif 'Bid' in col:
+            return lambda x: f"${x:.2f}"
+        elif 'Ask' in col:
+            return lambda x: f"${x:.2f}"
+        elif col == 'Mid Diff':
+            return lambda x: f"{Colors.GREEN}${x:.4f}{Colors.RESET}" if x > 0 else \
+                (f"{Colors.RED}${x:.4f}{Colors.RESET}" if x < 0 else f"${x:.4f}")
+        elif col == 'Mid Diff (bps)':
+            return lambda x: f"{Colors.GREEN}{x:.2f}{Colors.RESET}" if x > 0 else \
+                (f"{Colors.RED}{x:.2f}{Colors.RESET}" if x < 0 else f"{x:.2f}")
+        elif col == 'Arbitrage':
+            return lambda x: f"{Colors.BG_GREEN}{Colors.BLACK} {x} {Colors.RESET}" if x == 'Yes' else x
+        elif col == 'Direction':
+            return lambda x: f"{Colors.BOLD}{x}{Colors.RESET}" if x != '-' else x
+        elif col == 'Profit (bps)':
+            return lambda x: f"{Colors.BOLD}{Colors.GREEN}{x:.2f}{Colors.RESET}" if x > 0 else f"{x:.2f}"
     else:
         # Basic formatting without colors
-        for col in formatted_df.columns:
-            if 'Bid' in col or 'Ask' in col:
-                formatted_df[col] = formatted_df[col].apply(lambda x: f"${x:.2f}")
-            elif col == 'Mid Diff':
-                formatted_df[col] = formatted_df[col].apply(lambda x: f"${x:.4f}")
-            elif col == 'Mid Diff (bps)' or col == 'Profit (bps)':
-                formatted_df[col] = formatted_df[col].apply(lambda x: f"{x:.2f}")
+        if 'Bid' in col or 'Ask' in col:
+            return lambda x: f"${x:.2f}"
+        elif col == 'Mid Diff':
+            return lambda x: f"${x:.4f}"
+        elif col == 'Mid Diff (bps)' or col == 'Profit (bps)':
+            return lambda x: f"{x:.2f}"
+    return None
+
+def format_comparison_table(headers, rows):
+    """
+    Format exchange comparison rows for display in the terminal with colors and borders.
+    
+    Args:
+        headers: Column headers
+        rows: Iterable of rows, each a sequence of values in header order
+        
+    Returns:
+        Formatted string ready for terminal display
+    """
+    colored = is_color_supported()
+    formatters = [_comparison_cell_formatter(col, colored) for col in headers]
+    
+    formatted_rows = [
+        [fmt(value) if fmt else value for fmt, value in zip(formatters, row)]
+        for row in rows
+    ]
     
     # Format using tabulate with a nice grid
-    table = tabulate(
-        formatted_df, 
-        headers=formatted_df.columns,
-        tablefmt="grid",
-        showindex=False
-    )
+    return tabulate(formatted_rows, headers=headers, tablefmt="grid")
+
+def format_exchange_comparison_table(df):
+    """
+    Format a DataFrame for display in the terminal with colors and borders.
     
-    return table
+    Args:
+        df: Pandas DataFrame with exchange comparison data
+        
+    Returns:
+        Formatted string ready for terminal display
+    """
+    return format_comparison_table(list(df.columns), df.itertuples(index=False, name=None))
 
 def print_comparison_header(timestamp):
     """Print a header for the comparison table"""
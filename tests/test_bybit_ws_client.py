@@ -0,0 +1,94 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exchanges.bybit.ws_client import BybitWebSocketClient
+
+class _RecordingSocket:
+    """Stands in for the WebSocketApp, recording sent frames"""
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, frame):
+        self.sent.append(frame)
+
+def _connected_client(**kwargs):
+    client = BybitWebSocketClient(**kwargs)
+    client.ws = _RecordingSocket()
+    client.connected = True
+    client._connected_event.set()
+    return client
+
+def test_ticker_topics_counted_once_while_queued():
+    client = _connected_client()
+    try:
+        assert client.subscribe_ticker(["BTCUSDT", "BTCUSDT", "ETHUSDT"])
+        assert client.subscribe_ticker("BTCUSDT")
+        assert client._ticker_topics_active == 2
+    finally:
+        client._flush_timer.cancel()
+    
+    client._flush_subscriptions()
+    assert client.subscribe_ticker("ETHUSDT")
+    client._flush_timer.cancel()
+    assert client._ticker_topics_active == 2
+
+def test_failed_ticker_subscribe_is_not_counted():
+    client = _connected_client()
+    assert not client.subscribe_ticker([])
+    assert not client.subscribe_ticker(["X" * 30000])
+    assert client._ticker_topics_active == 0
+
+def test_plain_ticker_subscribe_tracks_ticker_state():
+    client = _connected_client()
+    assert client.subscribe("tickers.BTCUSDT")
+    client._flush_timer.cancel()
+    
+    client._make_dispatcher()(json.dumps({
+        "topic": "tickers.BTCUSDT",
+        "type": "snapshot",
+        "data": {"symbol": "BTCUSDT", "lastPrice": "50000", "fundingRate": "0.0001"},
+    }))
+    assert "BTCUSDT" in client.ticker_data
+
+def test_unsubscribe_uncounts_queued_ticker_topics_once():
+    client = _connected_client()
+    assert client.subscribe(["tickers.BTCUSDT", "tickers.ETHUSDT"])
+    client._flush_timer.cancel()
+    
+    assert client.unsubscribe(["tickers.BTCUSDT", "tickers.BTCUSDT", "tickers.XRPUSDT"])
+    assert client._ticker_topics_active == 1
+    assert client._pending_subs == ["tickers.ETHUSDT"]
+
+def test_full_queue_drops_oldest_and_counts(caplog):
+    client = BybitWebSocketClient(max_queue_size=3)
+    with caplog.at_level("WARNING"):
+        for i in range(10):
+            client._on_message(None, str(i))
+    
+    assert list(client._raw_q) == ["7", "8", "9"]
+    assert client._dropped_messages == 7
+    assert len([r for r in caplog.records if "queue full" in r.getMessage()]) == 1
+
+def test_connect_right_after_close_restarts_cleanly(monkeypatch):
+    def run_until_closed(self):
+        while not self._closed.is_set():
+            self._closed.wait(0.01)
+    monkeypatch.setattr(BybitWebSocketClient, "_run_forever_loop", run_until_closed)
+    
+    client = BybitWebSocketClient(dispatch_workers=2)
+    client.connect()
+    old_workers = list(client._workers)
+    
+    client.close()
+    client.connect()
+    try:
+        assert not client._closed.is_set()
+        assert client.ws_thread.is_alive()
+        assert not any(worker.is_alive() for worker in old_workers)
+        assert len(client._workers) == 2
+        assert all(worker.is_alive() for worker in client._workers)
+    finally:
+        client.close()
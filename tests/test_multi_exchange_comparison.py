@@ -0,0 +1,49 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from multi_exchange_comparison import MultiExchangeComparison
+
+# A books5 push as sent by OKX: a full snapshot with no "action" key
+BOOKS5_PUSH = {
+    "arg": {"channel": "books5", "instId": "BTC-USDT"},
+    "data": [{
+        "asks": [["8446", "95", "0", "3"], ["8447", "1", "0", "1"]],
+        "bids": [["8445", "2", "0", "1"], ["8444", "10", "0", "2"]],
+        "instId": "BTC-USDT",
+        "ts": "1597026383085",
+        "seqId": 123456
+    }]
+}
+
+def _comparison():
+    comparison = MultiExchangeComparison(["BTCUSDT"])
+    comparison.bybit_client.data = {}
+    comparison.okx_client.data = {}
+    return comparison
+
+def test_books5_push_is_stored_as_okx_quote():
+    comparison = _comparison()
+    
+    comparison.handle_okx_orderbook(BOOKS5_PUSH)
+    
+    tick = comparison.okx_client.data["BTCUSDT"]
+    assert (tick.bid, tick.ask, tick.bid_qty, tick.ask_qty) == (8445.0, 8446.0, 2.0, 95.0)
+
+def test_books5_frame_reaches_handler_through_client():
+    comparison = _comparison()
+    comparison.okx_client.callbacks["books5:BTC-USDT"] = comparison.handle_okx_orderbook
+    
+    comparison.okx_client._dispatch(json.dumps(BOOKS5_PUSH))
+    
+    assert comparison.okx_client.data["BTCUSDT"].bid == 8445.0
+
+def test_other_actions_and_events_are_ignored():
+    comparison = _comparison()
+    
+    comparison.handle_okx_orderbook(dict(BOOKS5_PUSH, action="unknown"))
+    comparison.handle_okx_orderbook({"event": "subscribe", "arg": BOOKS5_PUSH["arg"]})
+    
+    assert comparison.okx_client.data == {}
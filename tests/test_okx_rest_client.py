@@ -0,0 +1,65 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exchanges.okx.rest_client import OkxRestClient
+
+ijson = pytest.importorskip("ijson")
+
+SWAP_INSTRUMENTS = {
+    "code": "0",
+    "data": [
+        {"instId": "BTC-USDT-SWAP", "baseCcy": "BTC", "expTime": "", "tags": {"a": ["1"]}},
+        {"instId": "ETH-USD-SWAP", "baseCcy": "ETH", "expTime": ""},
+    ],
+    "msg": "",
+}
+
+class _StreamingResponse:
+    """Stands in for a streamed requests response"""
+    def __init__(self, body):
+        self.raw = io.BytesIO(json.dumps(body).encode())
+    
+    def raise_for_status(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+class _CountingSession:
+    """Stands in for the shared session, serving one body and counting requests"""
+    def __init__(self, body):
+        self.body = body
+        self.requests = 0
+    
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return _StreamingResponse(self.body)
+
+def _client(body):
+    client = OkxRestClient()
+    client.session = _CountingSession(body)
+    return client
+
+def test_streamed_instruments_are_cached():
+    client = _client(SWAP_INSTRUMENTS)
+    
+    assert client.get_perpetual_symbols() == ["BTC-USDT"]
+    assert client.get_perpetual_symbols() == ["BTC-USDT"]
+    assert client.session.requests == 1
+    assert client.get_instruments("SWAP") == SWAP_INSTRUMENTS["data"]
+
+def test_streamed_api_error_is_logged_and_not_cached(caplog):
+    client = _client({"code": "50011", "data": [], "msg": "Too Many Requests"})
+    
+    assert client.get_perpetual_symbols() == []
+    assert "API error: Too Many Requests" in caplog.text
+    assert not client._instruments_cache
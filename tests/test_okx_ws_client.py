@@ -0,0 +1,117 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exchanges.okx import ws_client
+from exchanges.okx.ws_client import OkxWebSocketClient
+
+class _RecordingSocket:
+    """Stands in for the WebSocketApp, recording sent frames"""
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, frame):
+        self.sent.append(frame)
+
+def _connected_client():
+    client = OkxWebSocketClient()
+    client.ws = _RecordingSocket()
+    client.connected = True
+    return client
+
+def test_checksum_resync_runs_on_consumer_thread():
+    client = _connected_client()
+    client.subscriptions["BTC-USDT-SWAP"] = "books"
+    client._dispatch(json.dumps({
+        "arg": {"channel": "books", "instId": "BTC-USDT-SWAP"},
+        "action": "snapshot",
+        "data": [{"bids": [["100", "1", "0", "1"]], "asks": [["101", "1", "0", "1"]], "ts": "1", "checksum": 12345}]
+    }))
+    order_book = client.order_books["BTC-USDT-SWAP"]
+    
+    # The verification loop only queues a marker; it never touches the book itself
+    client._inbox.append(ws_client._VERIFY_CHECKSUMS)
+    assert order_book.exch_check_sum == 12345
+    
+    # The consumer handles the marker, resetting the mismatched book and resubscribing
+    client._dispatch(client._inbox.popleft())
+    assert not order_book.exch_check_sum
+    assert [json.loads(frame)["op"] for frame in client.ws.sent] == ["unsubscribe", "subscribe"]
+
+def test_connect_after_close_restarts_a_stopping_consumer():
+    client = OkxWebSocketClient()
+    client._start_consumer()
+    first = client._consumer_thread
+    
+    # close() stops the consumer; starting again before it exits must still leave one running
+    client._consumer_running = False
+    client._inbox_event.set()
+    client._start_consumer()
+    
+    assert client._consumer_running
+    assert client._consumer_thread.is_alive()
+    assert not first.is_alive() or client._consumer_thread is first
+    
+    client._inbox.append("not json")
+    client._inbox_event.set()
+    deadline = time.monotonic() + 2
+    while client._inbox and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not client._inbox
+    
+    client._consumer_running = False
+    client._inbox_event.set()
+    client._consumer_thread.join(2)
+
+def test_op_frames_escape_instrument_ids():
+    client = _connected_client()
+    assert client._send_op("subscribe", "books5", ['BTC-USDT"},{"channel":"x', "ETH-USDT"])
+    
+    frame = json.loads(client.ws.sent[-1])
+    assert frame == {
+        "op": "subscribe",
+        "args": [
+            {"channel": "books5", "instId": 'BTC-USDT"},{"channel":"x'},
+            {"channel": "books5", "instId": "ETH-USDT"},
+        ],
+    }
+
+def test_order_books_recycle_levels_privately():
+    book = ws_client.OrderBook("BTC-USDT")
+    other = ws_client.OrderBook("ETH-USDT")
+    book.set_bids_on_snapshot(ws_client._parse_levels([["100", "1", "0", "1"]]))
+    
+    best = book.best_bid()
+    book.update_bids([["100", "0", "0", "0"], ["99", "2", "0", "1"]])
+    
+    # The returned level is a copy, so recycling the book's level leaves it intact
+    assert (best.price, best.quantity) == (100.0, 1.0)
+    assert book.best_bid_price() == 99.0
+    assert not other._pool
+
+def test_full_inbox_drops_oldest_and_counts(caplog):
+    client = OkxWebSocketClient(inbox_size=3)
+    with caplog.at_level("WARNING"):
+        for i in range(10):
+            client._on_message(None, str(i))
+    
+    assert list(client._inbox) == ["7", "8", "9"]
+    assert client._dropped_messages == 7
+    assert len([r for r in caplog.records if "inbox full" in r.getMessage()]) == 1
+
+def test_malformed_level_resyncs_instead_of_decode_error(caplog):
+    client = _connected_client()
+    client.subscriptions["BTC-USDT-SWAP"] = "books"
+    client._dispatch(json.dumps({
+        "arg": {"channel": "books", "instId": "BTC-USDT-SWAP"},
+        "action": "update",
+        "data": [{"asks": [["8476.98", "415", "0", "13"], ["bad", "1", "0", "1"]], "bids": []}],
+    }))
+    
+    assert "Failed to decode message" not in caplog.text
+    assert "Malformed orderbook levels for BTC-USDT-SWAP" in caplog.text
+    assert [json.loads(frame)["op"] for frame in client.ws.sent] == ["unsubscribe", "subscribe"]
+    assert not client.order_books["BTC-USDT-SWAP"]._asks
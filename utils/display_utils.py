@@ -1,9 +1,37 @@
 import os
 import math
 import time
-from tabulate import tabulate
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
+
+OPPORTUNITY_HEADERS = ["Symbol", "Best Pair", "Spread", "Binance", "Bybit", "OKX",
+                       "Countdown", "Profit/Fund", "Break Even", "APR", "Position"]
+ACTIVE_POSITION_HEADERS = ["Symbol", "Exchanges", "Notional Value", "Entry Time", "Duration", "Profit/Fund", "APR"]
+
+def format_table(rows: List[Sequence[str]], headers: Sequence[str], right_aligned: Sequence[int] = ()) -> str:
+    """
+    Format rows of preformatted strings as a plain-text table
+    
+    Args:
+        rows: Table rows, each a sequence of strings in header order
+        headers: Column headers
+        right_aligned: Indices of columns to right-align
+        
+    Returns:
+        Table with a header line, a dashed rule and one line per row
+    """
+    widths = [len(header) for header in headers]
+    for row in rows:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    
+    # Build the row template once and reuse it for every line
+    row_format = "  ".join(
+        f"{{:>{width}}}" if i in right_aligned else f"{{:<{width}}}"
+        for i, width in enumerate(widths)
+    )
+    lines = [row_format.format(*headers), "  ".join("-" * width for width in widths)]
+    lines.extend(row_format.format(*row) for row in rows)
+    return "\n".join(lines)
 
 def format_countdown(hours: float) -> str:
     """
@@ -56,7 +84,7 @@ def display_funding_metrics(
     if opportunities:
         print("\nBEST CROSS-EXCHANGE FUNDING OPPORTUNITIES:")
         
-        # Prepare data for tabulate
+        # Prepare table rows
         best_data = []
         for i, item in enumerate(opportunities[:15]):
             symbol = item['symbol']
@@ -100,11 +128,7 @@ def display_funding_metrics(
                 position_info
             ])
         
-        print(tabulate(
-            best_data, 
-            headers=["Symbol", "Best Pair", "Spread", "Binance", "Bybit", "OKX", 
-                    "Countdown", "Profit/Fund", "Break Even", "APR", "Position"]
-        ))
+        print(format_table(best_data, OPPORTUNITY_HEADERS, right_aligned=(8,)))
     else:
         print("\nNo profitable opportunities found at current thresholds.")
     
@@ -153,10 +177,7 @@ def display_funding_metrics(
     
     if active_data:
         print("\n\nACTIVE POSITIONS:")
-        print(tabulate(
-            active_data, 
-            headers=["Symbol", "Exchanges", "Notional Value", "Entry Time", "Duration", "Profit/Fund", "APR"]
-        ))
+        print(format_table(active_data, ACTIVE_POSITION_HEADERS))
     
     # Footer
     print(f"\n{'=' * 120}")
@@ -2,26 +2,40 @@ import logging
 import requests
 import time
 import traceback
-from typing import Dict, List, Set, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Set, Tuple, Optional, Any
+
+# Parse response bodies straight from bytes; orjson when available, else the stdlib
+# json module (which also accepts bytes)
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
 
 logger = logging.getLogger(__name__)
 
-def fetch_binance_futures_symbols(exclude_symbols: List[str] = None, include_only: List[str] = None) -> List[str]:
+# Shared session so repeated symbol discovery reuses pooled keep-alive connections
+_http = requests.Session()
+
+def fetch_binance_futures_symbols(exclude_symbols: Iterable[str] = None, include_only: Iterable[str] = None) -> List[str]:
     """
     Fetch all available futures symbols from Binance
     
     Args:
-        exclude_symbols: List of symbols to exclude
+        exclude_symbols: Symbols to exclude
         include_only: If provided, only include these symbols
         
     Returns:
         List of uppercase symbol strings
     """
+    # Hash-based membership for the per-symbol filter checks
+    exclude_symbols = frozenset(exclude_symbols or ())
+    include_only = frozenset(include_only or ())
+    
     try:
         # Get exchange info from Binance Futures API
-        response = requests.get('https://fapi.binance.com/fapi/v1/exchangeInfo')
+        response = _http.get('https://fapi.binance.com/fapi/v1/exchangeInfo', timeout=10)
         response.raise_for_status()
-        exchange_info = response.json()
+        exchange_info = _loads(response.content)
         
         # Filter for trading pairs ending with USDT
         all_symbols = []
@@ -132,6 +146,10 @@ def create_symbol_mappings(
     # Log exchange symbol counts for debugging
     logger.info(f"Creating mappings between exchanges - Binance: {len(binance_symbols)}, Bybit: {len(bybit_symbols)}, OKX: {len(okx_symbols)}")
     
+    # Hash sets for the per-symbol membership checks below
+    bybit_set = set(bybit_symbols)
+    okx_set = set(okx_symbols)
+    
     # Convert OKX symbols to standard format for fast lookup
     okx_standard_map = {}
     for symbol in okx_symbols:
@@ -154,9 +172,9 @@ def create_symbol_mappings(
         bybit_format1 = f"{base}-USDT"  # With hyphen
         bybit_format2 = std_symbol      # Without hyphen
         
-        if bybit_format1 in bybit_symbols:
+        if bybit_format1 in bybit_set:
             mapping['bybit'] = bybit_format1
-        elif bybit_format2 in bybit_symbols:
+        elif bybit_format2 in bybit_set:
             mapping['bybit'] = bybit_format2
         else:
             # Consider as missing in Bybit
@@ -171,7 +189,7 @@ def create_symbol_mappings(
             # Try different formats
             okx_format1 = f"{base}-USDT"  # With hyphen
             
-            if okx_format1 in okx_symbols:
+            if okx_format1 in okx_set:
                 mapping['okx'] = okx_format1
                 mapping['okx_instid'] = f"{okx_format1}-SWAP"
             else:
@@ -211,8 +229,8 @@ def filter_symbols(symbols: List[str], config: Dict[str, Any]) -> List[str]:
     Returns:
         Filtered list of symbols
     """
-    exclude_symbols = [s.upper() for s in config.get('symbol_filters', {}).get('exclude', [])]
-    include_only = [s.upper() for s in config.get('symbol_filters', {}).get('include_only', [])]
+    exclude_symbols = frozenset(s.upper() for s in config.get('symbol_filters', {}).get('exclude', []))
+    include_only = frozenset(s.upper() for s in config.get('symbol_filters', {}).get('include_only', []))
     
     filtered_symbols = []
     for symbol in symbols:
@@ -1,216 +1,296 @@
 import logging
 import math
 import time
+import numpy as np
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
+from functools import lru_cache
 from operator import itemgetter
 
 logger = logging.getLogger(__name__)
 
-def calculate_funding_metrics(
-    symbol: str,
-    exchange_data: Dict[str, Dict[str, Any]],
-    config: Dict[str, Any],
-) -> Dict[str, Any]:
+# Assuming 3 funding events per day
+FUNDING_EVENTS_PER_YEAR = 365 * 3
+
+# Fee rate used for exchanges without a configured rate
+DEFAULT_FEE_RATE = 0.0006
+
+def calculate_trading_costs(config: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Calculate arbitrage metrics between exchanges for a single symbol
+    Calculate the trading cost terms that depend only on the configuration
     
     Args:
-        symbol: Symbol to calculate metrics for
-        exchange_data: Dictionary with funding and price data from all exchanges
         config: Strategy configuration
         
     Returns:
-        Dictionary of calculated metrics or None if data is insufficient
+        Dictionary with notional value, per-exchange round-trip fees and slippage cost
     """
-    # Need data from at least 2 exchanges to calculate metrics
-    if len(exchange_data) < 2:
-        return None
-    
-    # Store all funding rates
-    funding_rates = {}
-    mark_prices = {}
-    next_funding_times = {}
+    notional_value = config.get('position_size_usd', 1000)
+    fee_rates = {
+        'binance': config.get('futures_fee_rate', 0.0004),
+        'bybit': config.get('bybit_fee_rate', 0.0006),
+        'okx': config.get('okx_fee_rate', 0.0005)
+    }
     
-    # Extract data from each exchange
-    for exchange, data in exchange_data.items():
-        if not data:
-            continue
-            
-        # Extract funding rate based on available field names
-        funding_rate = None
-        if 'funding_rate' in data:
-            funding_rate = float(data['funding_rate'])
-        elif 'fundingRate' in data:
-            funding_rate = float(data['fundingRate'])
-            
-        if funding_rate is not None:
-            funding_rates[exchange] = funding_rate
-            
-        # Extract mark price
-        mark_price = None
-        if 'mark_price' in data:
-            mark_price = float(data['mark_price'])
-        elif 'markPrice' in data:
-            mark_price = float(data['markPrice'])
-            
-        if mark_price is not None and mark_price > 0:
-            mark_prices[exchange] = mark_price
-            
-        # Extract next funding time
-        next_funding_time = None
-        if 'next_funding_time' in data:
-            next_funding_time = int(data['next_funding_time'])
-        elif 'nextFundingTime' in data:
-            next_funding_time = int(data['nextFundingTime'])
-            
-        if next_funding_time is not None and next_funding_time > 0:
-            next_funding_times[exchange] = next_funding_time
+    return {
+        'notional_value': notional_value,
+        # Entry and exit fees on each exchange
+        'fees': {exchange: notional_value * rate * 2 for exchange, rate in fee_rates.items()},
+        'default_fee': notional_value * DEFAULT_FEE_RATE * 2,
+        # Slippage on entry and exit on two exchanges
+        'slippage_cost': notional_value * config.get('slippage', 0.0003) * 4
+    }
+
+def _extract_exchange_fields(data: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], Optional[int]]:
+    """
+    Extract funding rate, mark price and next funding time from exchange data
     
-    # Skip if we don't have funding rates from at least 2 exchanges
-    if len(funding_rates) < 2:
-        return None
+    Args:
+        data: Funding and price data from one exchange
+        
+    Returns:
+        Tuple of (funding_rate, mark_price, next_funding_time), each None if unavailable
+    """
+    # Extract funding rate based on available field names
+    funding_rate = None
+    if 'funding_rate' in data:
+        funding_rate = float(data['funding_rate'])
+    elif 'fundingRate' in data:
+        funding_rate = float(data['fundingRate'])
+        
+    # Extract mark price
+    mark_price = None
+    if 'mark_price' in data:
+        mark_price = float(data['mark_price'])
+    elif 'markPrice' in data:
+        mark_price = float(data['markPrice'])
         
-    # Calculate all possible funding rate pairs and find the best one
-    exchange_pairs = []
+    # Extract next funding time
+    next_funding_time = None
+    if 'next_funding_time' in data:
+        next_funding_time = int(data['next_funding_time'])
+    elif 'nextFundingTime' in data:
+        next_funding_time = int(data['nextFundingTime'])
     
-    for long_exchange in funding_rates:
-        for short_exchange in funding_rates:
-            if long_exchange == short_exchange:
-                continue
-                
-            # Calculate funding rate spread (long pays negative rate, short pays positive rate)
-            spread = funding_rates[short_exchange] - funding_rates[long_exchange]
-            
-            # Store this pair if both exchanges have mark prices
-            if long_exchange in mark_prices and short_exchange in mark_prices:
-                exchange_pairs.append({
-                    'long_exchange': long_exchange,
-                    'short_exchange': short_exchange,
-                    'funding_spread': spread,
-                    'abs_funding_spread': abs(spread)
-                })
-                
-    # If no valid pairs found, return None
-    if not exchange_pairs:
-        return None
+    return funding_rate, mark_price, next_funding_time
+
+def calculate_funding_metrics_batch(
+    symbols: List[str],
+    exchange_data_list: List[Dict[str, Dict[str, Any]]],
+    config: Dict[str, Any],
+    trading_costs: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Calculate arbitrage metrics between exchanges for many symbols at once
+    
+    Exchange data is loaded into (symbol x exchange) arrays so the pair search,
+    cost and return calculations run as vectorized operations over all symbols.
+    
+    Args:
+        symbols: Symbols to calculate metrics for
+        exchange_data_list: Exchange data dictionary for each symbol, in the same order
+        config: Strategy configuration
+        trading_costs: Precomputed result of calculate_trading_costs(config)
         
-    # Find the pair with the highest absolute funding spread
-    best_pair = max(exchange_pairs, key=lambda x: x['abs_funding_spread'])
+    Returns:
+        Dictionary of calculated metrics keyed by symbol, for symbols with sufficient data
+    """
+    if trading_costs is None:
+        trading_costs = calculate_trading_costs(config)
     
-    # Get the exchange names for this pair
-    long_exchange = best_pair['long_exchange']
-    short_exchange = best_pair['short_exchange']
+    exchanges = list(dict.fromkeys(exchange for data in exchange_data_list for exchange in data))
+    columns = {exchange: j for j, exchange in enumerate(exchanges)}
+    n, m = len(symbols), len(exchanges)
     
-    # Calculate trading parameters for the best pair
-    funding_spread = best_pair['funding_spread']
-    abs_funding_spread = best_pair['abs_funding_spread']
+    # Extract data from each exchange into per-symbol rows, then build the arrays in one go
+    rate_rows, price_rows, time_rows, has_rate_rows, order_rows = [], [], [], [], []
+    for symbol, exchange_data in zip(symbols, exchange_data_list):
+        rates, prices, times = [0.0] * m, [0.0] * m, [0] * m
+        has_rates = [False] * m
+        # Position of each exchange in the symbol's own data, used to break ties between pairs
+        positions = [0] * m
+        
+        # Need data from at least 2 exchanges to calculate metrics
+        if len(exchange_data) >= 2:
+            try:
+                for k, (exchange, data) in enumerate(exchange_data.items()):
+                    j = columns[exchange]
+                    positions[j] = k
+                    if not data:
+                        continue
+                    
+                    funding_rate, mark_price, next_funding_time = _extract_exchange_fields(data)
+                    if funding_rate is not None:
+                        rates[j] = funding_rate
+                        has_rates[j] = True
+                    if mark_price is not None and mark_price > 0:
+                        prices[j] = mark_price
+                    if next_funding_time is not None and next_funding_time > 0:
+                        times[j] = next_funding_time
+            except (TypeError, ValueError) as e:
+                logger.error(f"Error calculating metrics for {symbol}: {str(e)}")
+                has_rates = [False] * m
+        
+        rate_rows.append(rates)
+        price_rows.append(prices)
+        time_rows.append(times)
+        has_rate_rows.append(has_rates)
+        order_rows.append(positions)
     
-    # Calculate trading costs
-    notional_value = config.get('position_size_usd', 1000)
+    funding_rates = np.array(rate_rows, dtype=float).reshape(n, m)
+    mark_prices = np.array(price_rows, dtype=float).reshape(n, m)
+    next_funding_times = np.array(time_rows, dtype=np.int64).reshape(n, m)
+    has_rate = np.array(has_rate_rows, dtype=bool).reshape(n, m)
+    order = np.array(order_rows, dtype=np.int64).reshape(n, m)
     
-    # Calculate quantities based on mark prices
-    long_qty = notional_value / mark_prices[long_exchange] if mark_prices[long_exchange] > 0 else 0
-    short_qty = notional_value / mark_prices[short_exchange] if mark_prices[short_exchange] > 0 else 0
+    # All ordered (long, short) exchange pairs
+    pairs = [(long_col, short_col) for long_col in range(m) for short_col in range(m) if long_col != short_col]
+    if not pairs:
+        return {}
+    long_idx = np.array([pair[0] for pair in pairs])
+    short_idx = np.array([pair[1] for pair in pairs])
     
-    # Calculate trading costs for each exchange
-    fee_rates = {
-        'binance': config.get('futures_fee_rate', 0.0004),
-        'bybit': config.get('bybit_fee_rate', 0.0006),
-        'okx': config.get('okx_fee_rate', 0.0005)
-    }
+    # Funding rate spread for every pair (long pays negative rate, short pays positive rate);
+    # a pair is usable if both exchanges have funding rates and mark prices
+    usable = has_rate & (mark_prices > 0)
+    pair_ok = usable[:, long_idx] & usable[:, short_idx]
+    spreads = funding_rates[:, short_idx] - funding_rates[:, long_idx]
     
-    # Entry and exit fees for both exchanges
-    long_fee = notional_value * fee_rates.get(long_exchange, 0.0006) * 2
-    short_fee = notional_value * fee_rates.get(short_exchange, 0.0006) * 2
+    # Find the pair with the highest absolute funding spread for each symbol; ties go
+    # to the first pair in the symbol's exchange order
+    rows = np.flatnonzero(pair_ok.any(axis=1))
+    if rows.size == 0:
+        return {}
+    abs_spreads = np.where(pair_ok, np.abs(spreads), -np.inf)[rows]
+    is_max = abs_spreads == abs_spreads.max(axis=1)[:, None]
+    pair_order = order[rows][:, long_idx] * m + order[rows][:, short_idx]
+    best = np.where(
+        is_max.any(axis=1),
+        np.where(is_max, pair_order, n * m * m).argmin(axis=1),
+        abs_spreads.argmax(axis=1)
+    )
+    long_cols = long_idx[best]
+    short_cols = short_idx[best]
+    funding_spread = spreads[rows, best]
+    abs_funding_spread = np.abs(funding_spread)
     
-    # Calculate slippage (entry and exit on two exchanges)
-    slippage_cost = notional_value * config.get('slippage', 0.0003) * 4
+    # Calculate quantities based on mark prices
+    notional_value = trading_costs['notional_value']
+    long_qty = notional_value / mark_prices[rows, long_cols]
+    short_qty = notional_value / mark_prices[rows, short_cols]
     
-    # Total trading cost
-    total_trading_cost = long_fee + short_fee + slippage_cost
+    # Total trading cost: entry and exit fees for both exchanges plus slippage
+    fee_by_column = np.array([trading_costs['fees'].get(exchange, trading_costs['default_fee']) for exchange in exchanges])
+    total_trading_cost = fee_by_column[long_cols] + fee_by_column[short_cols] + trading_costs['slippage_cost']
     
-    # Calculate expected profit for a single funding interval
+    # Calculate expected profit for a single funding interval and break-even events
     expected_profit_per_funding = abs_funding_spread * notional_value
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        break_even_events = np.where(
+            expected_profit_per_funding > 0,
+            np.maximum(1, np.ceil(total_trading_cost / expected_profit_per_funding)),
+            np.inf
+        )
+    is_profitable = np.isfinite(break_even_events) & (expected_profit_per_funding > 0)
     
-    # Calculate break-even events
-    if expected_profit_per_funding > 0:
-        break_even_events = max(1, math.ceil(total_trading_cost / expected_profit_per_funding))
-    else:
-        break_even_events = float('inf')
-        
-    # Calculate time until next funding
+    # Calculate annualized returns only for profitable symbols, leaving the rest at 0;
+    # APY uses expm1(log1p(r) / h), the same value as (1 + r) ** (1 / h) - 1 without the pow
+    apr = np.zeros(rows.size)
+    apy = np.zeros(rows.size)
+    if is_profitable.any():
+        periods = break_even_events[is_profitable]
+        total_profit = (expected_profit_per_funding[is_profitable] * periods) - total_trading_cost[is_profitable]
+        holding_time_fraction = periods / FUNDING_EVENTS_PER_YEAR
+        period_return = total_profit / notional_value
+        with np.errstate(over='ignore', invalid='ignore'):
+            apr[is_profitable] = period_return / holding_time_fraction
+            apy[is_profitable] = np.expm1(np.log1p(period_return) / holding_time_fraction)
+    
+    # Use the earliest funding time from either exchange, defaulting to 8 hours from now
     now_ms = int(time.time() * 1000)
+    long_funding_time = next_funding_times[rows, long_cols]
+    short_funding_time = next_funding_times[rows, short_cols]
+    next_funding_time = np.where(
+        (long_funding_time > 0) & (short_funding_time > 0),
+        np.minimum(long_funding_time, short_funding_time),
+        np.maximum(long_funding_time, short_funding_time)
+    )
+    next_funding_time = np.where(next_funding_time > 0, next_funding_time, now_ms + 28800000)
+    time_to_funding_hours = np.maximum(0, next_funding_time - now_ms) / (1000 * 60 * 60)
     
-    # Use the earliest funding time from either exchange
-    next_funding_time = 0
-    long_funding_time = next_funding_times.get(long_exchange, 0)
-    short_funding_time = next_funding_times.get(short_exchange, 0)
+    # Build the metrics dictionaries from plain Python values
+    columns_out = zip(
+        rows.tolist(), long_cols.tolist(), short_cols.tolist(),
+        funding_spread.tolist(), abs_funding_spread.tolist(),
+        time_to_funding_hours.tolist(), next_funding_time.tolist(),
+        long_qty.tolist(), short_qty.tolist(),
+        expected_profit_per_funding.tolist(), total_trading_cost.tolist(),
+        break_even_events.tolist(), is_profitable.tolist(), apr.tolist(), apy.tolist()
+    )
     
-    if long_funding_time > 0 and short_funding_time > 0:
-        next_funding_time = min(long_funding_time, short_funding_time)
-    elif long_funding_time > 0:
-        next_funding_time = long_funding_time
-    elif short_funding_time > 0:
-        next_funding_time = short_funding_time
-    else:
-        next_funding_time = now_ms + 28800000  # Default to 8 hours if no funding time available
+    results = {}
+    for (i, long_col, short_col, spread, abs_spread, hours, funding_time, l_qty, s_qty,
+         expected, cost, events, profitable, row_apr, row_apy) in columns_out:
+        symbol = symbols[i]
+        long_exchange = exchanges[long_col]
+        short_exchange = exchanges[short_col]
         
-    time_to_funding_ms = max(0, next_funding_time - now_ms)
-    time_to_funding_hours = time_to_funding_ms / (1000 * 60 * 60)
-    
-    # Calculate annualized returns
-    funding_events_per_year = 365 * 3  # Assuming 3 funding events per day
-    
-    # Only calculate if profitable
-    if break_even_events < float('inf') and expected_profit_per_funding > 0:
-        optimal_holding_periods = max(1, break_even_events)
-        total_profit = (expected_profit_per_funding * optimal_holding_periods) - total_trading_cost
-        holding_time_fraction = optimal_holding_periods / funding_events_per_year
+        metrics = {
+            'symbol': symbol,
+            'pair': f"{long_exchange.upper()}-{short_exchange.upper()}",
+            'funding_spread': spread,
+            'abs_funding_spread': abs_spread,
+            'long_exchange': long_exchange,
+            'short_exchange': short_exchange,
+            'time_to_funding_hours': hours,
+            'next_funding_time': funding_time,
+            'next_funding_str': format_timestamp(funding_time),
+            'notional_value': notional_value,
+            'long_qty': l_qty,
+            'short_qty': s_qty,
+            'expected_profit_per_funding': expected,
+            'total_trading_cost': cost,
+            'break_even_events': int(events) if profitable else events,
+            'is_profitable': profitable,
+            'apr': row_apr,
+            'apy': row_apy
+        }
         
-        # Calculate APR/APY
-        apr = (total_profit / notional_value) / holding_time_fraction if holding_time_fraction > 0 else 0
-        apy = ((1 + (total_profit / notional_value)) ** (1 / holding_time_fraction) - 1) if holding_time_fraction > 0 else 0
-    else:
-        apr = 0
-        apy = 0
-    
-    # Format funding times for display
-    next_funding_str = format_timestamp(next_funding_time)
-    
-    # Create the complete metrics dictionary
-    metrics = {
-        'symbol': symbol,
-        'pair': f"{long_exchange.upper()}-{short_exchange.upper()}",
-        'funding_spread': funding_spread,
-        'abs_funding_spread': abs_funding_spread,
-        'long_exchange': long_exchange,
-        'short_exchange': short_exchange,
-        'time_to_funding_hours': time_to_funding_hours,
-        'next_funding_time': next_funding_time,
-        'next_funding_str': next_funding_str,
-        'notional_value': notional_value,
-        'long_qty': long_qty,
-        'short_qty': short_qty,
-        'expected_profit_per_funding': expected_profit_per_funding,
-        'total_trading_cost': total_trading_cost,
-        'break_even_events': break_even_events,
-        'is_profitable': break_even_events < float('inf') and expected_profit_per_funding > 0,
-        'apr': apr,
-        'apy': apy
-    }
+        # Add exchange-specific data
+        for exchange in exchange_data_list[i]:
+            j = columns[exchange]
+            if has_rate_rows[i][j]:
+                metrics[f'{exchange}_funding_rate'] = rate_rows[i][j]
+            if price_rows[i][j] > 0:
+                metrics[f'{exchange}_mark_price'] = price_rows[i][j]
+        
+        results[symbol] = metrics
     
-    # Add exchange-specific data
-    for exchange in exchange_data.keys():
-        if exchange in funding_rates:
-            metrics[f'{exchange}_funding_rate'] = funding_rates[exchange]
-        if exchange in mark_prices:
-            metrics[f'{exchange}_mark_price'] = mark_prices[exchange]
+    return results
+
+def calculate_funding_metrics(
+    symbol: str,
+    exchange_data: Dict[str, Dict[str, Any]],
+    config: Dict[str, Any],
+    trading_costs: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Calculate arbitrage metrics between exchanges for a single symbol
     
-    return metrics
+    Args:
+        symbol: Symbol to calculate metrics for
+        exchange_data: Dictionary with funding and price data from all exchanges
+        config: Strategy configuration
+        trading_costs: Precomputed result of calculate_trading_costs(config)
+        
+    Returns:
+        Dictionary of calculated metrics or None if data is insufficient
+    """
+    return calculate_funding_metrics_batch([symbol], [exchange_data], config, trading_costs).get(symbol)
 
+@lru_cache(maxsize=1024)
 def format_timestamp(timestamp_ms):
-    """Format millisecond timestamp to readable date/time"""
+    """Format millisecond timestamp to readable date/time (cached, as symbols share funding times)"""
     if timestamp_ms <= 0:
         return "Unknown"
     return datetime.fromtimestamp(timestamp_ms/1000).strftime('%Y-%m-%d %H:%M:%S')
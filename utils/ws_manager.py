@@ -1,6 +1,7 @@
 import time
 import logging
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -29,9 +30,9 @@ def initialize_binance_websocket(symbols: List[str], max_retries: int = 3, retry
             attempts += 1
             logger.info(f"Connecting to Binance WebSocket (attempt {attempts}/{max_retries})...")
             
-            # Connect to Binance WebSocket for real-time data
+            # Connect to Binance WebSocket for real-time data (the client lowercases symbols itself)
             client = BinanceWebSocketClient(
-                futures_symbols=[s.lower() for s in symbols],
+                futures_symbols=symbols,
                 mark_price_freq="1s",
                 use_all_market_stream=True
             )
@@ -89,33 +90,23 @@ def initialize_bybit_websocket(symbols: List[str], symbol_mappings: Dict[str, Di
                 success = True
                 logger.info("Bybit WebSocket connected successfully")
                 
-                # Subscribe to tickers for all symbols
-                subscription_errors = 0
+                # Subscribe to tickers for all mapped symbols with a single request
+                bybit_symbols = []
                 for symbol in symbols:
-                    try:
-                        # Get the correct Bybit symbol from our mapping
-                        bybit_symbol = symbol_mappings.get(symbol, {}).get('bybit')
-                        if not bybit_symbol:
-                            logger.warning(f"No Bybit mapping found for {symbol}, skipping subscription")
-                            continue
-                        
-                        # Add a small delay between subscriptions to avoid overwhelming the API
-                        time.sleep(0.1)
-                        
-                        # Subscribe to ticker channel
-                        subscribe_result = client.subscribe_ticker(bybit_symbol)
-                        if subscribe_result:
-                            logger.debug(f"Successfully subscribed to ticker for {bybit_symbol} on Bybit")
-                        else:
-                            logger.warning(f"Failed to subscribe to {bybit_symbol} on Bybit")
-                            subscription_errors += 1
-                            
-                    except Exception as e:
-                        subscription_errors += 1
-                        logger.warning(f"Error subscribing to {symbol} on Bybit: {str(e)}")
+                    # Get the correct Bybit symbol from our mapping
+                    bybit_symbol = symbol_mappings.get(symbol, {}).get('bybit')
+                    if bybit_symbol:
+                        bybit_symbols.append(bybit_symbol)
+                    else:
+                        logger.warning(f"No Bybit mapping found for {symbol}, skipping subscription")
                 
-                if subscription_errors > 0:
-                    logger.warning(f"Failed to subscribe to {subscription_errors} symbols on Bybit WebSocket. REST API will be used as fallback.")
+                try:
+                    if bybit_symbols and client.subscribe_ticker(bybit_symbols):
+                        logger.debug(f"Successfully subscribed to tickers for {len(bybit_symbols)} symbols on Bybit")
+                    elif bybit_symbols:
+                        logger.warning(f"Failed to subscribe to {len(bybit_symbols)} symbols on Bybit WebSocket. REST API will be used as fallback.")
+                except Exception as e:
+                    logger.warning(f"Error subscribing to tickers on Bybit: {str(e)}. REST API will be used as fallback.")
             else:
                 logger.warning("Bybit WebSocket connected but client reports disconnected state")
                 success = False
@@ -230,17 +221,22 @@ def initialize_all_websockets(symbols: List[str], symbol_mappings: Dict[str, Dic
     ws_clients = {}
     ws_connected = {}
     
-    # Connect to Binance WebSocket
-    if 'binance' in exchanges_to_use:
-        ws_clients['binance'], ws_connected['binance'] = initialize_binance_websocket(symbols)
+    initializers = {
+        'binance': lambda: initialize_binance_websocket(symbols),
+        'bybit': lambda: initialize_bybit_websocket(symbols, symbol_mappings),
+        'okx': lambda: initialize_okx_websocket(symbols, symbol_mappings)
+    }
+    selected = [exchange for exchange in initializers if exchange in exchanges_to_use]
+    if not selected:
+        return ws_clients, ws_connected
     
-    # Connect to Bybit WebSocket
-    if 'bybit' in exchanges_to_use:
-        ws_clients['bybit'], ws_connected['bybit'] = initialize_bybit_websocket(symbols, symbol_mappings)
-        
-    # Connect to OKX WebSocket
-    if 'okx' in exchanges_to_use:
-        ws_clients['okx'], ws_connected['okx'] = initialize_okx_websocket(symbols, symbol_mappings)
+    # The exchanges are independent endpoints, so connect to them concurrently;
+    # results are stored afterwards from this thread
+    with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+        futures = {exchange: executor.submit(initializers[exchange]) for exchange in selected}
+    
+    for exchange, future in futures.items():
+        ws_clients[exchange], ws_connected[exchange] = future.result()
     
     return ws_clients, ws_connected
 